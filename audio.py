@@ -0,0 +1,131 @@
+"""Motor de sonido: mixer de baja latencia, sonidos predecodificados y canales por categoría.
+
+Cada categoría (mezcla, acierto, fallo) tiene sus propios canales reservados, así que
+un sonido nunca roba la voz de otro distinto; si todos los de su categoría están
+sonando se reutiliza el que lleva más tiempo. Los disparos repetidos de una categoría
+dentro de su intervalo mínimo se descartan (p. ej. un bucle que lo pide en cada frame).
+"""
+import time
+from collections import deque
+
+import pygame
+
+# Formato del mixer. Un buffer de 512 muestras a 44,1 kHz son ~12 ms de latencia de
+# salida; el valor por defecto de SDL (hasta 4096) llega a ~93 ms
+FRECUENCIA = 44100
+BUFFER = 512
+
+# archivo, canales reservados, intervalo mínimo entre disparos (ms) y volumen
+SONIDOS = {
+    "mezcla": {"archivo": "mix.wav", "canales": 2, "intervalo_ms": 100, "volumen": 0.8},
+    "acierto": {"archivo": "success.wav", "canales": 1, "intervalo_ms": 250, "volumen": 1.0},
+    "fallo": {"archivo": "fail.wav", "canales": 1, "intervalo_ms": 250, "volumen": 1.0},
+}
+
+
+class MotorAudio:
+    def __init__(self, carpeta, sonidos=SONIDOS, frecuencia=FRECUENCIA, buffer=BUFFER):
+        self.carpeta = carpeta
+        self.config = sonidos
+        self.frecuencia = frecuencia
+        self.buffer = buffer
+        self.iniciado = False
+        self.activo = False          # mixer abierto
+        self.sonidos = {}            # categoría -> Sound (None si falta el archivo)
+        self._canales = {}           # categoría -> [Channel, ...] reservados
+        self._siguiente = {}         # categoría -> índice del canal a reutilizar si todos suenan
+        self._ultimo = {}            # categoría -> perf_counter del último disparo
+        # Estadísticas
+        self.disparos = 0
+        self.descartados = 0         # por intervalo mínimo
+        self.robados = 0             # canal reutilizado mientras sonaba
+        self.voces_max = 0
+        self.latencia_buffer_ms = 0.0
+        self._despacho_us = deque(maxlen=256)  # de sonar() a Channel.play() devuelto
+
+    def iniciar(self, decodificar=True) -> bool:
+        # Abre el mixer con el buffer pequeño y reserva canales. Con decodificar=False los
+        # sonidos se dejan para quien llama (main los carga en segundo plano con decodificar()
+        # y se entregan con poner()); hasta entonces sonar() no hace nada
+        self.iniciado = True
+        try:
+            pygame.mixer.pre_init(self.frecuencia, -16, 2, self.buffer)
+            pygame.mixer.init()
+        except pygame.error:
+            return False
+        frecuencia = pygame.mixer.get_init()[0]
+        self.latencia_buffer_ms = self.buffer * 1000.0 / frecuencia
+        total = sum(c["canales"] for c in self.config.values())
+        pygame.mixer.set_num_channels(max(8, total))
+        pygame.mixer.set_reserved(total)
+        k = 0
+        for nombre, cfg in self.config.items():
+            self._canales[nombre] = [pygame.mixer.Channel(k + j) for j in range(cfg["canales"])]
+            self._siguiente[nombre] = 0
+            k += cfg["canales"]
+            if decodificar:
+                self.sonidos[nombre] = self.decodificar(nombre)
+        self.activo = True
+        return True
+
+    def decodificar(self, nombre):
+        # Sound decodifica el WAV entero al formato del mixer; al reproducir ya no se toca el disco
+        cfg = self.config[nombre]
+        try:
+            snd = pygame.mixer.Sound(str(self.carpeta / cfg["archivo"]))
+        except (pygame.error, OSError):
+            return None
+        snd.set_volume(cfg["volumen"])
+        return snd
+
+    def poner(self, nombre, snd):
+        self.sonidos[nombre] = snd
+
+    def sonar(self, nombre):
+        t0 = time.perf_counter()
+        snd = self.sonidos.get(nombre)
+        if snd is None:
+            return
+        ultimo = self._ultimo.get(nombre)
+        if ultimo is not None and (t0 - ultimo) * 1000.0 < self.config[nombre]["intervalo_ms"]:
+            self.descartados += 1
+            return
+        self._ultimo[nombre] = t0
+        canales = self._canales[nombre]
+        canal = next((c for c in canales if not c.get_busy()), None)
+        if canal is None:
+            # Todos ocupados: se corta el más antiguo de la categoría (rotando)
+            i = self._siguiente[nombre]
+            canal = canales[i]
+            self._siguiente[nombre] = (i + 1) % len(canales)
+            self.robados += 1
+        canal.play(snd)
+        self.disparos += 1
+        self._despacho_us.append((time.perf_counter() - t0) * 1e6)
+        voces = self.voces()
+        if voces > self.voces_max:
+            self.voces_max = voces
+
+    def voces(self) -> int:
+        return sum(c.get_busy() for canales in self._canales.values() for c in canales)
+
+    def estadisticas(self):
+        """Disparos, descartes, voces y latencia (buffer de salida y despacho p50/max en µs)."""
+        despacho = sorted(self._despacho_us)
+        return {
+            "activo": self.activo,
+            "disparos": self.disparos,
+            "descartados": self.descartados,
+            "robados": self.robados,
+            "voces": self.voces() if self.activo else 0,
+            "voces_max": self.voces_max,
+            "latencia_buffer_ms": round(self.latencia_buffer_ms, 2),
+            "despacho_p50_us": round(despacho[len(despacho) // 2], 1) if despacho else 0.0,
+            "despacho_max_us": round(despacho[-1], 1) if despacho else 0.0,
+        }
+
+    def linea(self):
+        # Resumen de una línea para el overlay del perfilador
+        e = self.estadisticas()
+        return (f"audio voces {e['voces']}/{e['voces_max']}  disp {e['disparos']} desc {e['descartados']}  "
+                f"buf {e['latencia_buffer_ms']:.1f}ms  desp {e['despacho_p50_us']:.0f}us")
@@ -0,0 +1,180 @@
+"""Benchmark sin ventana del bucle real de main.py (SDL_VIDEODRIVER/SDL_AUDIODRIVER=dummy).
+
+Uso:
+    python benchmarks/bench_juego.py [--salida resultados.json] [--arranques N] [--frames-espera N]
+
+Mide:
+  - arranque: tiempo de 'import main' y hasta el primer frame dibujado en un proceso
+    nuevo (mínimo y mediana de N); los assets siguen cargándose en segundo plano.
+    Incluye la mediana de cada fase del desglose de main.arranque (perfil.Arranque).
+  - assets: preparar cada sprite en vivo frente a cargarlo de assets/cache.
+  - frames: por dificultad, guion completo (Comenzar, mezcla, clic en un vaso, R) a
+    través de main.frame(dt) con dt fijo de 60 Hz; FPS alcanzables por estado.
+  - memoria: pico de tracemalloc durante el guion y RSS máximo del proceso.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+DT = 1000.0 / 60.0
+
+
+def rss_max_kb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux devuelve KiB, macOS bytes
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def medir_arranque(n):
+    codigo = (
+        "import time, json; t0 = time.perf_counter(); import main; t1 = time.perf_counter(); "
+        "main.frame(0); t2 = time.perf_counter(); "
+        "print(json.dumps([t1 - t0, t2 - t0, main.arranque.resumen()['fases']]))"
+    )
+    tiempos = []
+    primeros = []
+    fases = {}
+    for _ in range(n):
+        out = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True, check=True)
+        importar, primero, desglose = json.loads(out.stdout.strip().splitlines()[-1])
+        tiempos.append(importar * 1000.0)
+        primeros.append(primero * 1000.0)
+        for fase, ms in desglose.items():
+            fases.setdefault(fase, []).append(ms)
+    return {
+        "n": n,
+        "min_ms": round(min(tiempos), 2),
+        "mediana_ms": round(statistics.median(tiempos), 2),
+        "primer_frame_min_ms": round(min(primeros), 2),
+        "primer_frame_mediana_ms": round(statistics.median(primeros), 2),
+        "fases_mediana_ms": {fase: round(statistics.median(v), 2) for fase, v in fases.items()},
+    }
+
+
+def medir_assets(main):
+    import sprites
+
+    assets_dir = main.BASE_DIR / "assets"
+    res = {}
+    for nombre, tam in sprites.tamanos_sprites(main.ANCHO, main.ALTO).items():
+        origen = assets_dir / sprites.ASSETS[nombre]["archivo"]
+        if not origen.exists():
+            continue
+        t0 = time.perf_counter()
+        sprites.preparar_sprite(origen, nombre, tam)
+        t1 = time.perf_counter()
+        sprites.cargar_sprite(assets_dir, nombre, tam)
+        t2 = time.perf_counter()
+        res[nombre] = {"en_vivo_ms": round((t1 - t0) * 1000.0, 2), "cache_ms": round((t2 - t1) * 1000.0, 2)}
+    return res
+
+
+def evento(pygame, tipo, **kw):
+    pygame.event.post(pygame.event.Event(tipo, **kw))
+
+
+def tecla(pygame, key):
+    evento(pygame, pygame.KEYDOWN, key=key, mod=0, unicode="", scancode=0)
+
+
+def guion(main, pygame, diff_index, frames_espera):
+    """Una ronda completa con la dificultad dada; devuelve {estado: [frames, segundos]}."""
+    juego = main.juego
+    por_estado = {}
+
+    def correr(n=1):
+        for _ in range(n):
+            estado = juego.estado
+            t0 = time.perf_counter()
+            main.frame(DT)
+            acum = por_estado.setdefault(estado, [0, 0.0])
+            acum[0] += 1
+            acum[1] += time.perf_counter() - t0
+
+    # MENÚ: elegir dificultad con las flechas y esperar un rato sin hacer nada
+    while juego.diff_index != diff_index:
+        tecla(pygame, pygame.K_RIGHT)
+        correr()
+    correr(frames_espera)
+    # Comenzar y dejar pasar bajada + mezcla
+    evento(pygame, pygame.MOUSEBUTTONDOWN, pos=main._btn_rect_cache.center, button=1)
+    correr()
+    limite = 100000
+    while juego.estado != main.ESTADO_ESPERA_CLIC and limite:
+        correr()
+        limite -= 1
+    correr(frames_espera)
+    # Clic en un vaso
+    x, y = juego.vasos[0]
+    evento(pygame, pygame.MOUSEBUTTONDOWN, pos=(int(x) + 5, int(y) + 5), button=1)
+    correr()
+    correr(frames_espera)
+    # R para volver al menú
+    tecla(pygame, pygame.K_r)
+    correr()
+    return por_estado
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--salida", default="bench_juego.json", help="archivo JSON de resultados")
+    parser.add_argument("--arranques", type=int, default=5)
+    parser.add_argument("--frames-espera", type=int, default=120, help="frames en estados de espera (menú, clic, fin)")
+    args = parser.parse_args()
+
+    resultados = {
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "arranque": medir_arranque(args.arranques),
+    }
+
+    tracemalloc.start()
+    import pygame
+
+    import main
+
+    resultados["pygame"] = pygame.version.ver
+    resultados["render"] = type(main.escena).__name__
+    # Medir los frames con los assets definitivos, no con las formas de reserva
+    main.cargador.esperar()
+    main.recibir_assets()
+    resultados["assets"] = medir_assets(main)
+
+    frames = {}
+    for diff_index, nombre in enumerate(main.diff_names):
+        por_estado = guion(main, pygame, diff_index, args.frames_espera)
+        frames[nombre] = {
+            estado: {"frames": n, "ms_por_frame": round(seg * 1000.0 / n, 4), "fps": round(n / seg, 1) if seg else None}
+            for estado, (n, seg) in por_estado.items()
+        }
+    resultados["frames"] = frames
+    _actual, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    resultados["memoria"] = {"tracemalloc_pico_kb": pico // 1024, "rss_max_kb": rss_max_kb()}
+    resultados["textos"] = {"aciertos": main.textos.aciertos, "fallos": main.textos.fallos}
+
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(resultados, f, indent=2, ensure_ascii=False)
+    print(json.dumps(resultados, indent=2, ensure_ascii=False))
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,36 @@
+"""Simulación masiva sin ventana con motor.Juego (carga y equilibrado de dificultad).
+
+Uso:
+    python benchmarks/bench_motor.py [--partidas N] [--dt MS]
+
+Juega N rondas por dificultad eligiendo vaso al azar y muestra partidas/segundo.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from motor import diff_names, simular  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--partidas", type=int, default=2000)
+    parser.add_argument("--dt", type=float, default=1000.0 / 60.0, help="ms por paso de simulación (el juego usa pasos de 1000/120)")
+    args = parser.parse_args()
+
+    print(f"{'dificultad':<10} {'partidas/s':>12} {'aciertos':>9}")
+    for diff_index, nombre in enumerate(diff_names):
+        t0 = time.perf_counter()
+        aciertos = 0
+        for semilla in range(args.partidas):
+            aciertos += simular(semilla, diff_index=diff_index, dt=args.dt).score
+        seg = time.perf_counter() - t0
+        print(f"{nombre:<10} {args.partidas / seg:>12.0f} {aciertos / args.partidas:>9.1%}")
+    assert "pygame" not in sys.modules
+
+
+if __name__ == "__main__":
+    main()
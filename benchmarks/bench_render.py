@@ -0,0 +1,144 @@
+"""Comparación sin ventana de los dos backends de dibujo (software y GPU) con el mismo guion.
+
+Uso:
+    python benchmarks/bench_render.py [--frames N] [--cada N] [--salida resultados.json]
+
+Cada backend corre en un proceso nuevo con SDL_VIDEODRIVER=dummy. El de GPU usa
+TRILERO_GPU=1 con el driver "software" del Renderer de SDL (SDL_RENDER_DRIVER), que
+no necesita tarjeta gráfica, así que el camino de texturas se prueba en cualquier máquina.
+Mide ms por frame de main.frame(dt) y compara los frames capturados cada N: la
+pantalla en software y Renderer.to_surface() en GPU (píxeles distintos y diferencia
+máxima por canal; los bordes semitransparentes pueden diferir en algún nivel).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+DT = 1000.0 / 60.0
+
+
+def correr_guion(frames, cada, carpeta):
+    # Proceso hijo: el backend lo eligen las variables de entorno que pone el padre
+    import random
+
+    random.seed(1)
+    sys.path.insert(0, str(RAIZ))
+    import pygame
+
+    import main
+
+    main.cargador.esperar()
+    main.recibir_assets()
+    juego = main.juego
+
+    def evento(tipo, **kw):
+        pygame.event.post(pygame.event.Event(tipo, **kw))
+
+    tiempos = []
+    capturas = 0
+    for f in range(frames):
+        if f == 3:
+            evento(pygame.KEYDOWN, key=pygame.K_RIGHT, mod=0, unicode="", scancode=0)
+        if f in (5, frames // 2):
+            evento(pygame.MOUSEBUTTONDOWN, pos=main._btn_rect_cache.center, button=1)
+        if juego.estado == main.ESTADO_ESPERA_CLIC:
+            x, y = juego.vasos[1]
+            evento(pygame.MOUSEBUTTONDOWN, pos=(int(x) + 5, int(y) + 5), button=1)
+        t0 = time.perf_counter()
+        main.frame(DT)
+        tiempos.append((time.perf_counter() - t0) * 1000.0)
+        if f % cada == 0:
+            # Siempre un frame entero para poder capturarlo
+            main.escena.invalidar()
+            main.dibujar()
+            if main.renderer is not None:
+                surf = main.renderer.to_surface()
+            else:
+                surf = main.pantalla
+            (carpeta / f"{f:05d}.rgb").write_bytes(pygame.image.tobytes(surf, "RGB"))
+            capturas += 1
+    return {
+        "backend": type(main.escena).__name__,
+        "frames": frames,
+        "capturas": capturas,
+        "ms_por_frame_mediana": round(statistics.median(tiempos), 4),
+        "ms_por_frame_media": round(statistics.fmean(tiempos), 4),
+        "estado_final": juego.estado,
+    }
+
+
+def lanzar(gpu, frames, cada, carpeta):
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy", TRILERO_GPU="1" if gpu else "0")
+    if gpu:
+        env["SDL_RENDER_DRIVER"] = "software"
+    cmd = [sys.executable, __file__, "--hijo", str(carpeta), "--frames", str(frames), "--cada", str(cada)]
+    out = subprocess.run(cmd, cwd=RAIZ, env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def comparar(a: bytes, b: bytes):
+    # (píxeles distintos, diferencia máxima en un canal)
+    if a == b:
+        return 0, 0
+    distintos = 0
+    maxima = 0
+    for i in range(0, len(a), 3):
+        d = max(abs(a[i] - b[i]), abs(a[i + 1] - b[i + 1]), abs(a[i + 2] - b[i + 2]))
+        if d:
+            distintos += 1
+            if d > maxima:
+                maxima = d
+    return distintos, maxima
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--cada", type=int, default=50, help="capturar y comparar un frame de cada N")
+    parser.add_argument("--salida", default="bench_render.json", help="archivo JSON de resultados")
+    parser.add_argument("--hijo", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.hijo:
+        print(json.dumps(correr_guion(args.frames, args.cada, Path(args.hijo))))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dir_sw, dir_gpu = Path(tmp, "software"), Path(tmp, "gpu")
+        dir_sw.mkdir()
+        dir_gpu.mkdir()
+        resultados = {
+            "software": lanzar(False, args.frames, args.cada, dir_sw),
+            "gpu": lanzar(True, args.frames, args.cada, dir_gpu),
+        }
+        total = 0
+        peor = 0
+        maxima = 0
+        for captura in sorted(dir_sw.iterdir()):
+            a = captura.read_bytes()
+            b = (dir_gpu / captura.name).read_bytes()
+            distintos, d = comparar(a, b)
+            total += 1
+            peor = max(peor, distintos)
+            maxima = max(maxima, d)
+        pixeles = len(a) // 3 if total else 0
+    resultados["comparacion"] = {
+        "capturas": total,
+        "peor_fraccion_distinta": round(peor / pixeles, 6) if pixeles else None,
+        "diferencia_maxima": maxima,
+    }
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(resultados, f, indent=2, ensure_ascii=False)
+    print(json.dumps(resultados, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main_bench()
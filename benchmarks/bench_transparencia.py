@@ -0,0 +1,71 @@
+"""Benchmark de apply_transparency: máscaras en bloque frente al bucle píxel a píxel.
+
+Uso:
+    python benchmarks/bench_transparencia.py [--repeticiones N] [--sin-pixel]
+
+Mide los tamaños que usa el juego (150x150 y 40x40) y las imágenes originales a
+resolución completa, y comprueba que ambas versiones producen el mismo resultado.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+import pygame  # noqa: E402
+
+from sprites import apply_transparency, apply_transparency_pixel  # noqa: E402
+
+
+def medir(fn, surf, repeticiones):
+    mejor = float("inf")
+    res = None
+    for _ in range(repeticiones):
+        copia = surf.copy()
+        t0 = time.perf_counter()
+        res = fn(copia)
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor, res
+
+
+def iguales(a: pygame.Surface, b: pygame.Surface) -> bool:
+    return pygame.image.tobytes(a, "RGBA") == pygame.image.tobytes(b, "RGBA")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--sin-pixel", action="store_true", help="no medir el bucle original (lento a tamaño completo)")
+    args = parser.parse_args()
+
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+
+    casos = []
+    for nombre, tam in (("vaso.png", (150, 150)), ("bola.png", (40, 40))):
+        original = pygame.image.load(str(RAIZ / "assets" / nombre)).convert_alpha()
+        casos.append((f"{nombre} {tam[0]}x{tam[1]}", pygame.transform.scale(original, tam).convert_alpha()))
+        w, h = original.get_size()
+        casos.append((f"{nombre} {w}x{h} (completa)", original))
+
+    print(f"{'caso':<28} {'bloque ms':>10} {'pixel ms':>10} {'x':>8}  igual")
+    for etiqueta, surf in casos:
+        t_bloque, r_bloque = medir(apply_transparency, surf, args.repeticiones)
+        if args.sin_pixel:
+            print(f"{etiqueta:<28} {t_bloque * 1000:>10.2f} {'-':>10} {'-':>8}  -")
+            continue
+        t_pixel, r_pixel = medir(apply_transparency_pixel, surf, 1)
+        ok = "sí" if iguales(r_bloque, r_pixel) else "NO"
+        print(f"{etiqueta:<28} {t_bloque * 1000:>10.2f} {t_pixel * 1000:>10.2f} {t_pixel / t_bloque:>8.0f}  {ok}")
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
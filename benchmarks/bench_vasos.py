@@ -0,0 +1,118 @@
+"""Tiempo por frame según el número de vasos (SDL_VIDEODRIVER/SDL_AUDIODRIVER=dummy).
+
+Uso:
+    python benchmarks/bench_vasos.py [--vasos 3 8 16 32 64] [--frames N]
+
+Cada número de vasos se mide en un proceso nuevo (main.py fija la mesa al
+importarse con TRILERO_VASOS). Durante la mezcla se mide el frame completo a
+través de main.frame(dt), la lógica sola (Juego.paso) y el hit-test (vaso_en).
+También se muestra cuántos movimientos caben en una mezcla de Difícil y cuánto
+trabajo (ms si fueran de uno en uno) comprime el planificador en ese tiempo.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+DT = 1000.0 / 60.0
+
+
+def medir(frames):
+    # Se ejecuta en el proceso hijo, con TRILERO_VASOS ya fijado
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    sys.path.insert(0, str(RAIZ))
+    import pygame
+
+    import main
+    from motor import Juego
+
+    juego = main.juego
+    juego.diff_index = len(main.diff_names) - 1  # la mezcla más larga
+    t_frame = []
+    t_logica = []
+    while len(t_frame) < frames:
+        if juego.estado == main.ESTADO_MENU:
+            juego.pulsar_boton()
+        elif juego.estado == main.ESTADO_ESPERA_CLIC:
+            juego.elegir(0)
+        elif juego.estado == main.ESTADO_FIN:
+            juego.volver_menu()
+        mezcla = juego.estado == main.ESTADO_MEZCLA
+        t0 = time.perf_counter()
+        main.frame(DT)
+        if mezcla:
+            t_frame.append(time.perf_counter() - t0)
+
+    # Lógica sola: otra partida sin vista
+    solo = Juego(main.mesa, semilla=1, diff_index=juego.diff_index)
+    solo.comenzar()
+    movs = compresion = None
+    while len(t_logica) < frames or movs is None:
+        if solo.estado == main.ESTADO_ESPERA_CLIC:
+            if movs is None:
+                movs = len(solo.movs_mezcla)
+                compresion = solo.mezcla_trabajo_ms / solo.mezcla_ms
+            solo.elegir(0)
+            solo.paso(DT)
+            solo.pulsar_boton()
+            solo.pulsar_boton()
+        mezcla = solo.estado == main.ESTADO_MEZCLA
+        t0 = time.perf_counter()
+        solo.paso(DT)
+        if mezcla:
+            t_logica.append(time.perf_counter() - t0)
+
+    # Hit-test sobre una rejilla de puntos de la ventana
+    puntos = [(x, y) for x in range(0, main.ANCHO, 16) for y in range(0, main.ALTO, 16)]
+    t0 = time.perf_counter()
+    for x, y in puntos:
+        juego.vaso_en(x, y)
+    t_hit = (time.perf_counter() - t0) / len(puntos)
+    pygame.quit()
+
+    def ms(v):
+        return round(v * 1000.0, 4)
+
+    t_frame.sort()
+    return {
+        "vasos": main.mesa.n_vasos,
+        "frame_p50_ms": ms(statistics.median(t_frame)),
+        "frame_p95_ms": ms(t_frame[int(0.95 * (len(t_frame) - 1))]),
+        "logica_us": round(statistics.median(t_logica) * 1e6, 2),
+        "vaso_en_us": round(t_hit * 1e6, 2),
+        "movimientos": movs,
+        "compresion": round(compresion, 2),
+    }
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vasos", type=int, nargs="+", default=[3, 8, 16, 32, 64])
+    parser.add_argument("--frames", type=int, default=600, help="frames de mezcla medidos por número de vasos")
+    parser.add_argument("--hijo", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.hijo:
+        print(json.dumps(medir(args.frames)))
+        return
+
+    print(f"{'vasos':>5} {'frame p50':>10} {'frame p95':>10} {'lógica':>10} {'vaso_en':>9} {'movs':>5} {'compr.':>7}")
+    for n in args.vasos:
+        entorno = dict(os.environ, TRILERO_VASOS=str(n))
+        out = subprocess.run(
+            [sys.executable, __file__, "--hijo", "--frames", str(args.frames)],
+            cwd=RAIZ, env=entorno, capture_output=True, text=True, check=True,
+        )
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        print(f"{r['vasos']:>5} {r['frame_p50_ms']:>8.3f}ms {r['frame_p95_ms']:>8.3f}ms "
+              f"{r['logica_us']:>8.1f}us {r['vaso_en_us']:>7.2f}us {r['movimientos']:>5} {r['compresion']:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main_bench()
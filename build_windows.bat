@@ -22,6 +22,12 @@ if exist build rmdir /s /q build
 if exist dist rmdir /s /q dist
 if exist Trilero.spec del /q Trilero.spec
 
+REM 2.1) Compile pre-scaled, pre-keyed sprites into assets\cache (shipped with the build)
+py compilar_assets.py --limpiar
+if errorlevel 1 (
+  echo Asset compilation failed, the game will prepare sprites at startup.
+)
+
 REM 3) Build with PyInstaller (onedir)
 py -m PyInstaller --clean --onedir --noconsole --name Trilero --add-data "assets;assets" main.py
 if errorlevel 1 (
@@ -0,0 +1,96 @@
+"""Carga de assets en segundo plano (hilos en escritorio, tareas asyncio en web).
+
+El juego pide cada asset con pedir(nombre, fn, *args) y sigue dibujando con sus
+formas de reserva; en cada frame recoger() devuelve los que ya han llegado para
+cambiarlos en caliente. En web no hay hilos: cada trabajo corre en una tarea
+asyncio que cede el control al navegador entre uno y otro.
+
+Con pedir(..., grupo=g) gana el último pedido del grupo: los anteriores que aún no
+han empezado se saltan (llegan como fallidos, valor None). Así, al arrastrar el borde
+de la ventana solo se rasteriza el tamaño más reciente de cada sprite.
+"""
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Cargador:
+    def __init__(self, web=False, hilos=2, avisar=None):
+        self.web = web
+        self.avisar = avisar  # se llama (desde el hilo trabajador) cada vez que termina un trabajo
+        self.total = 0
+        self.hechos = 0       # entregados por recoger()
+        self._listos = queue.SimpleQueue()
+        self._futuros = []
+        self._cola_web = []
+        self._tarea = None
+        self._ultimo = {}     # grupo -> número del último pedido de ese grupo
+        self._pool = None if web else ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="carga")
+
+    def pedir(self, nombre, fn, *args, grupo=None):
+        self.total += 1
+        turno = None
+        if grupo is not None:
+            turno = self._ultimo[grupo] = self._ultimo.get(grupo, 0) + 1
+        if self.web:
+            self._cola_web.append((nombre, fn, args, grupo, turno))
+            return
+        self._futuros.append(self._pool.submit(self._trabajo, nombre, fn, args, grupo, turno))
+
+    def _obsoleto(self, grupo, turno) -> bool:
+        # Hay un pedido más reciente del mismo grupo
+        return grupo is not None and self._ultimo[grupo] != turno
+
+    def _trabajo(self, nombre, fn, args, grupo, turno):
+        # Corre en un hilo trabajador; el resultado se entrega en el hilo principal con recoger()
+        valor = None  # se queda la forma de reserva
+        if not self._obsoleto(grupo, turno):
+            try:
+                valor = fn(*args)
+            except Exception:
+                pass
+        self._listos.put((nombre, valor))
+        if self.avisar is not None:
+            self.avisar()
+
+    async def _correr_web(self):
+        import asyncio
+
+        while self._cola_web:
+            nombre, fn, args, grupo, turno = self._cola_web.pop(0)
+            if self._obsoleto(grupo, turno):
+                self._listos.put((nombre, None))
+                continue
+            # Ceder antes de cada trabajo para que el navegador pinte el frame actual
+            await asyncio.sleep(0)
+            try:
+                valor = fn(*args)
+            except Exception:
+                valor = None
+            self._listos.put((nombre, valor))
+        self._tarea = None
+
+    def pendiente(self) -> bool:
+        return self.hechos < self.total
+
+    def recoger(self):
+        """Lista de (nombre, valor) llegados desde la última llamada (valor None si falló
+        o se saltó por obsoleto)."""
+        if self.web and self._cola_web and self._tarea is None:
+            # asyncio se importa solo en web (en escritorio alarga el arranque sin usarse)
+            import asyncio
+
+            self._tarea = asyncio.get_event_loop().create_task(self._correr_web())
+        llegados = []
+        while True:
+            try:
+                llegados.append(self._listos.get_nowait())
+            except queue.Empty:
+                break
+        self.hechos += len(llegados)
+        return llegados
+
+    def esperar(self):
+        # Bloquea hasta que terminen los trabajos pedidos (benchmarks y pruebas; solo escritorio)
+        for futuro in self._futuros:
+            futuro.result()
+        self._futuros = []
@@ -0,0 +1,89 @@
+"""Compila los sprites del juego a assets/cache (escalados y con transparencia aplicada).
+
+Uso:
+    python compilar_assets.py [--resoluciones 640x480 800x600 ...] [--limpiar] [--web]
+
+main.py busca primero en la caché; si una entrada falta o está desfasada vuelve a
+la ruta en vivo (decodificar + escalar + apply_transparency). Con --web se genera
+además assets/web/trilero.pak, el paquete que carga la versión de navegador (con
+los sprites a la primera resolución de la lista).
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame  # noqa: E402
+
+from sprites import (  # noqa: E402
+    ASSETS, CACHE_SUBDIR, PAQUETE_WEB, clave_sprite, escribir_paquete, guardar_sprite, preparar_sprite, ruta_cache,
+    tamanos_sprites,
+)
+
+BASE_DIR = Path(__file__).resolve().parent
+# Resolución del juego (ANCHO, ALTO en main.py)
+RESOLUCIONES = ["640x480"]
+
+
+def parse_res(txt: str):
+    w, h = txt.lower().split("x")
+    return int(w), int(h)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resoluciones", nargs="+", default=RESOLUCIONES, help="resoluciones de destino, p. ej. 640x480")
+    parser.add_argument("--assets", default=str(BASE_DIR / "assets"), help="carpeta de assets")
+    parser.add_argument("--limpiar", action="store_true", help="borrar entradas de caché que no se han generado ahora")
+    parser.add_argument("--web", action="store_true", help=f"generar también assets/{PAQUETE_WEB} para la versión web")
+    args = parser.parse_args()
+
+    assets_dir = Path(args.assets)
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+
+    generadas = set()
+    for res in args.resoluciones:
+        ancho, alto = parse_res(res)
+        for nombre, tam in tamanos_sprites(ancho, alto).items():
+            origen = assets_dir / ASSETS[nombre]["archivo"]
+            if not origen.exists():
+                print(f"  {nombre}: falta {origen.name}, se omite")
+                continue
+            destino = ruta_cache(assets_dir, nombre, tam, clave_sprite(origen, nombre, tam))
+            generadas.add(destino.name)
+            if destino.exists():
+                print(f"  {destino.name}: al día")
+                continue
+            t0 = time.perf_counter()
+            guardar_sprite(destino, nombre, preparar_sprite(origen, nombre, tam))
+            print(f"  {destino.name}: {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    if args.web:
+        ancho, alto = parse_res(args.resoluciones[0])
+        sprites = {}
+        for nombre, tam in tamanos_sprites(ancho, alto).items():
+            origen = assets_dir / ASSETS[nombre]["archivo"]
+            if origen.exists():
+                sprites[nombre] = preparar_sprite(origen, nombre, tam)
+        destino = assets_dir / PAQUETE_WEB
+        escribir_paquete(destino, sprites)
+        originales = sum((assets_dir / ASSETS[n]["archivo"]).stat().st_size for n in sprites)
+        print(f"  {PAQUETE_WEB}: {destino.stat().st_size // 1024} KiB (originales: {originales // 1024} KiB)")
+
+    if args.limpiar:
+        for f in (assets_dir / CACHE_SUBDIR).glob("*"):
+            if f.is_file() and f.name not in generadas:
+                f.unlink()
+                print(f"  borrado {f.name}")
+
+    pygame.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
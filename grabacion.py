@@ -0,0 +1,187 @@
+"""Grabación y reproducción determinista de partidas (formato binario compacto).
+
+Formato (little-endian):
+    cabecera: b"TRIL" | versión u8 | semilla u64 | dificultad u8 | vasos u8
+    registros, cada uno empieza por un byte de tipo:
+        0x01 FRAME   dt en microsegundos (varint)
+        0x02 ACCION  código u8 | argumento i8
+        0x03 MEZCLA  dificultad u8 | n movimientos (varint) | n x (k u8, k x vaso u8)
+
+Los FRAME llevan el dt real de cada frame (con sus tirones) y se escriben en
+motor.PasoFijo.avanzar antes de repartirlo en pasos fijos; las ACCION en el
+orden en que ocurren y MEZCLA cuando el motor termina de programar los
+movimientos de una mezcla (en reproducción se usa para comprobar que no hay
+divergencias).
+
+Uso sin ventana (reproducción a máxima velocidad):
+    python grabacion.py partida.tril
+"""
+import struct
+import sys
+
+MAGIA = b"TRIL"
+VERSION = 1
+_CABECERA = struct.Struct("<4sBQBB")
+
+FRAME = 0x01
+ACCION = 0x02
+MEZCLA = 0x03
+
+# Acciones del jugador en motor.Juego que se graban (código -> nombre del método)
+ACCIONES = ["comenzar", "volver_menu", "pulsar_boton", "elegir", "cambiar_dificultad", "alternar_trampa", "alternar_maraton"]
+_CODIGOS = {nombre: i for i, nombre in enumerate(ACCIONES)}
+
+
+class ErrorReproduccion(Exception):
+    pass
+
+
+def _varint(n: int) -> bytes:
+    out = bytearray()
+    while True:
+        b = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            return bytes(out)
+
+
+class Grabador:
+    """Escribe la sesión en un archivo; se engancha a motor.Juego con juego.grabador = Grabador(...)."""
+
+    def __init__(self, ruta, semilla: int, diff_index: int, n_vasos: int = 3):
+        self._f = open(ruta, "wb")
+        self._f.write(_CABECERA.pack(MAGIA, VERSION, semilla, diff_index, n_vasos))
+
+    def frame(self, dt) -> float:
+        # Se cuantiza a microsegundos y se devuelve el valor exacto que se reproducirá
+        us = max(0, int(round(dt * 1000)))
+        self._f.write(bytes((FRAME,)) + _varint(us))
+        return us / 1000.0
+
+    def accion(self, nombre: str, arg: int = 0):
+        self._f.write(struct.pack("<BBb", ACCION, _CODIGOS[nombre], arg))
+
+    def mezcla(self, diff_index: int, movimientos):
+        datos = bytearray((MEZCLA, diff_index))
+        datos += _varint(len(movimientos))
+        for mov in movimientos:
+            datos.append(len(mov))
+            datos += bytes(mov)
+        self._f.write(datos)
+
+    def cerrar(self):
+        if not self._f.closed:
+            self._f.close()
+
+
+def _leer_varint(f) -> int:
+    n = shift = 0
+    while True:
+        b = f.read(1)
+        if not b:
+            raise ErrorReproduccion("archivo truncado")
+        b = b[0]
+        n |= (b & 0x7F) << shift
+        if not b & 0x80:
+            return n
+        shift += 7
+
+
+def leer_cabecera(f):
+    datos = f.read(_CABECERA.size)
+    if len(datos) < _CABECERA.size:
+        raise ErrorReproduccion("cabecera incompleta")
+    magia, version, semilla, diff_index, n_vasos = _CABECERA.unpack(datos)
+    if magia != MAGIA or version != VERSION:
+        raise ErrorReproduccion(f"formato no soportado: {magia!r} v{version}")
+    return semilla, diff_index, n_vasos
+
+
+def leer_registros(f):
+    """Genera los registros uno a uno sin cargar el archivo entero.
+
+    ("frame", dt_ms) | ("accion", nombre, arg) | ("mezcla", dificultad, [(i1, i2), (a, b, c), ...])
+    """
+    while True:
+        tipo = f.read(1)
+        if not tipo:
+            return
+        tipo = tipo[0]
+        if tipo == FRAME:
+            yield ("frame", _leer_varint(f) / 1000.0)
+        elif tipo == ACCION:
+            codigo, arg = struct.unpack("<Bb", f.read(2))
+            yield ("accion", ACCIONES[codigo], arg)
+        elif tipo == MEZCLA:
+            diff_index = f.read(1)[0]
+            n = _leer_varint(f)
+            movimientos = []
+            for _ in range(n):
+                k = f.read(1)[0]
+                movimientos.append(tuple(f.read(k)))
+            yield ("mezcla", diff_index, movimientos)
+        else:
+            raise ErrorReproduccion(f"registro desconocido 0x{tipo:02x}")
+
+
+def aplicar(juego, registro, paso_fijo):
+    """Aplica un registro a un Juego. Devuelve el dt si era un FRAME (ya avanzado con
+    paso_fijo, un motor.PasoFijo como el de la partida grabada), o None."""
+    tipo = registro[0]
+    if tipo == "frame":
+        paso_fijo.avanzar(juego, registro[1])
+        return registro[1]
+    if tipo == "accion":
+        _tipo, nombre, arg = registro
+        metodo = getattr(juego, nombre)
+        if nombre in ("elegir", "cambiar_dificultad"):
+            metodo(arg)
+        else:
+            metodo()
+        return None
+    _tipo, diff_index, movimientos = registro
+    if diff_index != juego.diff_index or juego.movs_mezcla != [tuple(m) for m in movimientos]:
+        raise ErrorReproduccion("la mezcla generada no coincide con la grabada")
+    return None
+
+
+def abrir(ruta, mesa=None, oyente=None):
+    """Abre una grabación y devuelve (juego, registros) listos para reproducir en streaming."""
+    from motor import Juego, Mesa
+
+    f = open(ruta, "rb")
+    semilla, diff_index, n_vasos = leer_cabecera(f)
+    if mesa is None:
+        mesa = Mesa(640, 480, n_vasos)
+    elif mesa.n_vasos != n_vasos:
+        f.close()
+        raise ErrorReproduccion(f"la grabación es de {n_vasos} vasos y la mesa tiene {mesa.n_vasos}")
+    juego = Juego(mesa, semilla=semilla, diff_index=diff_index, oyente=oyente)
+    return juego, leer_registros(f)
+
+
+def main(argv):
+    if len(argv) != 2:
+        print(__doc__)
+        return 2
+    from motor import PasoFijo
+
+    juego, registros = abrir(argv[1])
+    paso_fijo = PasoFijo()
+    frames = 0
+    total = peor = 0.0
+    for reg in registros:
+        dt = aplicar(juego, reg, paso_fijo)
+        if dt is not None:
+            frames += 1
+            total += dt
+            peor = max(peor, dt)
+    print(f"frames={frames} duracion={total / 1000:.1f}s dt_max={peor:.1f}ms rondas={juego.rounds} puntos={juego.score} estado={juego.estado}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -1,195 +1,203 @@
+from time import perf_counter
+_T_INICIO = perf_counter()  # origen del desglose del arranque (perfil.Arranque)
+
 import pygame
-import random
+_T_PYGAME = perf_counter()
 import os
 import sys
 from pathlib import Path
-import math
-import asyncio
+import random
 import traceback
+from collections import namedtuple
+
+from audio import MotorAudio
+from cargador import Cargador
+from grabacion import Grabador, aplicar, abrir as abrir_grabacion
+from motor import (
+    ESTADO_BAJAR, ESTADO_ESPERA_CLIC, ESTADO_FIN, ESTADO_MENU, ESTADO_MEZCLA, ESTADO_MOSTRAR, ESTADO_REVELA,
+    Juego, Mesa, PasoFijo, diff_names,
+)
+from perfil import Arranque, Perfilador
+from planificador import PlanificadorWeb
+from render import (
+    Atlas, CacheRaster, CacheTextos, CapaEstatica, Escena, EscenaGPU, renderer_de_pantalla, ventana_de_pantalla,
+)
+from sprites import PAQUETE_WEB, cargar_sprite, sprite_de_paquete, tamanos_sprites
 
 # --- Ruta base del proyecto
 # En escritorio: carpeta del archivo actual
 # En web (pygbag/emscripten): usar ruta relativa para que 'assets/' se sirva correctamente
 IS_WEB = (sys.platform == "emscripten") or ("PYGBAG" in os.environ)
 BASE_DIR = Path(".") if IS_WEB else Path(__file__).resolve().parent
-WEB_DEBUG = IS_WEB  # activar superposición y dibujos simplificados en navegador
+# Superposición y dibujos simplificados en navegador (TRILERO_WEB_DEBUG=1); por defecto, arte real
+WEB_DEBUG = IS_WEB and os.environ.get("TRILERO_WEB_DEBUG") == "1"
+# Render por rectángulos sucios (solo se repinta lo que cambia); TRILERO_SUCIO=0 fuerza flip completo
+RENDER_SUCIO = (not IS_WEB) and os.environ.get("TRILERO_SUCIO", "1") != "0"
+# Backend de dibujo: TRILERO_GPU=1 dibuja con texturas en el Renderer de SDL (render.EscenaGPU)
+# en vez de blits por software; si no hay Renderer se sigue por software
+RENDER_GPU = os.environ.get("TRILERO_GPU") == "1"
+# Frecuencia de render en escritorio (30, 60, 144...; 0 = sin límite). La lógica va a paso fijo aparte
+FPS_RENDER = int(os.environ.get("TRILERO_FPS", "60"))
 
 # --- Inicialización ---
-pygame.init()
+# Solo los subsistemas que hacen falta para el primer frame (pygame.init() abriría
+# también audio, joysticks...). El mixer se abre con el primer gesto (ver desbloquear_audio).
+# TRILERO_ARRANQUE=1 muestra el desglose del arranque al dibujar el primer frame
+arranque = Arranque(_T_INICIO)
+arranque.marcar("import_pygame", _T_PYGAME)
+arranque.marcar("import_modulos")
+MOSTRAR_ARRANQUE = os.environ.get("TRILERO_ARRANQUE") == "1"
+pygame.display.init()
+pygame.font.init()
 pygame.display.set_caption("Juego del Trilero")
 
 # --- Configuración de pantalla ---
-# Resolución objetivo 640x480 con escala desde el diseño base 800x600
-BASE_W, BASE_H = 800, 600
+# Resolución lógica 640x480 con escala desde el diseño base 800x600 (ver motor.Mesa): el
+# motor y las grabaciones trabajan siempre en estas coordenadas. En escritorio la ventana
+# es redimensionable (F11: pantalla completa) y la mesa se dibuja en un lienzo 4:3
+# centrado de ANCHO*K x ALTO*K píxeles (ver aplicar_ventana)
 ANCHO, ALTO = 640, 480
-SCALE = min(ANCHO / BASE_W, ALTO / BASE_H)
-def S(v: float) -> int:
-    return int(round(v * SCALE))
-
-flags = pygame.SCALED if IS_WEB else 0
+# Número de vasos en la mesa (3 a 64); TRILERO_VASOS=N para jugar con más
+N_VASOS = int(os.environ.get("TRILERO_VASOS", "3"))
+mesa = Mesa(ANCHO, ALTO, N_VASOS)
+VENTANA_MIN = (320, 240)
+
+if RENDER_GPU:
+    # SCALED crea el Renderer de la ventana y la escala entera (con bandas) a 640x480 lógicos;
+    # en GPU el lienzo se queda en ese tamaño y la escala la hace SDL
+    flags = pygame.SCALED if IS_WEB else pygame.SCALED | pygame.RESIZABLE
+else:
+    flags = pygame.SCALED if IS_WEB else pygame.RESIZABLE
 pantalla = pygame.display.set_mode((ANCHO, ALTO), flags)
+renderer = renderer_de_pantalla() if RENDER_GPU else None
+if not IS_WEB:
+    ventana = ventana_de_pantalla()
+    if ventana is not None:
+        # Sin API de ventana, aplicar_ventana limita el lienzo igualmente
+        ventana.minimum_size = VENTANA_MIN
+pantalla_completa = False
+_tam_ventana = (ANCHO, ALTO)  # tamaño en ventana, para volver de pantalla completa
 reloj = pygame.time.Clock()
-
-# --- Cargar imágenes (en web se dibujan formas para máxima compatibilidad) ---
+if renderer is not None:
+    escena = EscenaGPU(renderer)
+else:
+    escena = Escena(pantalla, sucio=RENDER_SUCIO)
+# Perfilador por fases (F3 activa/desactiva el overlay, F4 exporta CSV y JSON)
+perfil = Perfilador()
+arranque.marcar("ventana")
+
+# --- Carga de assets en segundo plano ---
+# El primer frame sale enseguida con las formas de reserva (fondo verde, vasos grises y
+# bola roja); las imágenes se cargan en hilos (tareas asyncio en web) y se cambian
+# en caliente al llegar (recibir_assets), con una barra de progreso mientras tanto.
+EVENTO_CARGA = pygame.event.custom_type()  # despierta el bucle en reposo al llegar un asset
+
+def _avisar_carga():
+    try:
+        pygame.event.post(pygame.event.Event(EVENTO_CARGA))
+    except pygame.error:
+        pass  # ventana ya cerrada
+
+cargador = Cargador(web=IS_WEB, avisar=None if IS_WEB else _avisar_carga)
+
+# --- Imágenes ---
+# En escritorio los sprites salen de assets/cache (ver compilar_assets.py); si la caché no
+# está o está desfasada se decodifican, escalan y se les aplica transparencia en vivo
+# (apply_transparency en sprites.py). En web se leen del paquete assets/web/trilero.pak
+# (compilar_assets.py --web), ya escalados y sin fondo; sin paquete quedan las formas.
+# Cada tamaño de ventana necesita los sprites rasterizados a su escala: pedir_sprites()
+# los toma de 'rasters' (LRU por nombre y tamaño) o los encarga al cargador y, mientras
+# llegan, usa un escalado rápido del que ya había. Cada sprite es un grupo del cargador:
+# un tamaño nuevo deja sin rasterizar los anteriores que no hayan empezado. Solo se escriben en assets/cache los del
+# lienzo de arranque (640x480), que es el único que se lee al abrir el juego: al arrastrar el
+# borde de la ventana cada tamaño intermedio dejaría en disco un fondo de varios MB.
 fondo = None
 vaso_img = None
 bola_img = None
-if not IS_WEB:
-    try:
-        fondo = pygame.image.load(str(BASE_DIR / "assets" / "fondo.jpg")).convert()
-        fondo = pygame.transform.scale(fondo, (ANCHO, ALTO))
-    except Exception:
-        fondo = None
-    try:
-        vaso_img = pygame.image.load(str(BASE_DIR / "assets" / "vaso.png")).convert_alpha()
-    except Exception:
-        vaso_img = None
-    try:
-        bola_img = pygame.image.load(str(BASE_DIR / "assets" / "bola.png")).convert_alpha()
-    except Exception:
-        bola_img = None
-
-# --- Utilidades de imagen ---
-# Escalar las imágenes para que queden más uniformes y aplicar transparencia por colorkey con tolerancia
-def apply_transparency(surf: pygame.Surface, fallback_colors=((255, 255, 255), (0, 0, 0)), tol=15):
-    surf = surf.convert_alpha()
-    try:
-        corner = surf.get_at((0, 0))[:3]
-    except Exception:
-        corner = None
-    w, h = surf.get_size()
-    px = pygame.PixelArray(surf)
-    # Helper: marcar transparente si color está cerca de 'ref'
-    def clear_color_near(ref):
-        if ref is None:
-            return
-        r0, g0, b0 = ref
-        for y in range(h):
-            for x in range(w):
-                r, g, b, a = surf.unmap_rgb(px[x, y])
-                if abs(r - r0) <= tol and abs(g - g0) <= tol and abs(b - b0) <= tol:
-                    px[x, y] = (r, g, b, 0)
-    # Aplicar tolerancia a esquina y a fallback comunes
-    clear_color_near(corner)
-    for col in fallback_colors:
-        clear_color_near(col)
-    del px
-    return surf
-
-if not IS_WEB:
-    if vaso_img is not None:
-        vaso_img = pygame.transform.scale(vaso_img, (150, 150)).convert_alpha()
-        vaso_img = apply_transparency(vaso_img)
-    if bola_img is not None:
-        bola_img = pygame.transform.scale(bola_img, (40, 40)).convert_alpha()
-        bola_img = apply_transparency(bola_img)
-
-# --- Posiciones y estado iniciales ---
-VASO_W, VASO_H = S(150), S(150)
-
-def posiciones_centradas():
-    sep = S(260)  # separación proporcional
-    cx = ANCHO // 2
-    # En el menú, vasos por encima del botón (escala de 120 px)
-    y_top = ALTO - S(120) - VASO_H - S(120)
-    # Centro ligeramente más bajo
-    y_center = ALTO // 2 - VASO_H // 2 + S(40)
-    xs = [cx - sep - VASO_W // 2, cx - VASO_W // 2, cx + sep - VASO_W // 2]
-    top = [(xs[0], y_top), (xs[1], y_top), (xs[2], y_top)]
-    mid = [(xs[0], y_center), (xs[1], y_center), (xs[2], y_center)]
-    return top, mid
-
-# Posiciones: arriba (pre-juego) y juego (centradas)
-vasos_pos_inicial_top, _vasos_pos_juego_base = posiciones_centradas()
-# Línea base de la bola en el menú (los vasos bajarán hasta alinear su base con esta altura)
-# Más separación con el botón: bola 80 px (escalado) por encima del botón
-BALL_MENU_Y = ALTO - S(120) - S(80)
-# Posiciones de juego: misma X que base, y alineada a BALL_MENU_Y (base del vaso coincide con la bola)
-vasos_pos_juego = [(x, BALL_MENU_Y - VASO_H) for (x, _y) in _vasos_pos_juego_base]
-vasos_pos_inicial = vasos_pos_inicial_top
-
-# Representación de vasos como objetos con posiciones float para animación
-vasos = [{"x": float(x), "y": float(y)} for (x, y) in vasos_pos_inicial]
-
-# --- Estados del juego ---
-ESTADO_MENU = "MENU"
-ESTADO_BAJAR = "BAJAR"
-ESTADO_MOSTRAR = "MOSTRAR"
-ESTADO_MEZCLA = "MEZCLA"
-ESTADO_ESPERA_CLIC = "ESPERA_CLIC"
-ESTADO_REVELA = "REVELA"
-ESTADO_FIN = "FIN"
-
-estado = ESTADO_MENU
-mostrar_ms = 1500  # ms mostrando la bola al inicio (no usada si saltamos MOSTRAR)
-timer_ms = mostrar_ms
-
-# Índice del vaso que contiene la bola
-indice_bola = random.randint(0, 2)
-
-# --- Parámetros y buffers de la mezcla animada ---
-swap_queue = []  # lista de pares (i1, i2)
-swapping = False
-swap_i1 = swap_i2 = None
-swap_t = 0.0
-swap_duracion = 380.0  # ms por intercambio (se ajusta con dificultad)
-swap_inicio_1 = (0.0, 0.0)
-swap_inicio_2 = (0.0, 0.0)
-swap_objetivo_1 = (0.0, 0.0)
-swap_objetivo_2 = (0.0, 0.0)
-
-# --- Animación de bajada inicial ---
-bajar_t = 0.0
-bajar_duracion = 600.0  # ms
-bajar_inicio = [(float(x), float(y)) for (x, y) in vasos_pos_inicial_top]
-bajar_objetivo = [(float(x), float(y)) for (x, y) in vasos_pos_juego]
+SPRITES = (("fondo", "fondo"), ("vaso_img", "vaso"), ("bola_img", "bola"))
+rasters = CacheRaster(maximo=16)  # (nombre, tamaño) -> Surface; también las fuentes
+
+def pedir_sprites(tams, guardar=False):
+    for global_, nombre in SPRITES:
+        tam = tams[nombre]
+        surf = rasters.get((nombre, tam))
+        if surf is not None:
+            globals()[global_] = surf
+            continue
+        actual = globals()[global_]
+        if actual is not None and actual.get_size() != tam:
+            # Provisional hasta que llegue el rasterizado del original (una vez por tamaño)
+            globals()[global_] = pygame.transform.smoothscale(actual, tam)
+        if IS_WEB:
+            cargador.pedir((global_, nombre, tam), sprite_de_paquete, BASE_DIR / "assets" / PAQUETE_WEB, nombre, tam,
+                           grupo=nombre)
+        else:
+            cargador.pedir((global_, nombre, tam), cargar_sprite, BASE_DIR / "assets", nombre, tam, guardar,
+                           grupo=nombre)
 
 # --- Fuente para mensajes y HUD ---
-if IS_WEB:
-    # En web usamos la fuente por defecto para evitar problemas de SysFont
-    font = pygame.font.Font(None, S(36))
-    font_small = pygame.font.Font(None, S(28))
-else:
-    font = pygame.font.SysFont(None, S(36))
-    font_small = pygame.font.SysFont(None, S(28))
-mensaje = "Memoriza la posición de la bola"
-score = 0
-rounds = 0
-
-# --- Dificultades disponibles ---
-difficulties = {
-    "Fácil": {"swaps": 8, "dur_ms": 420.0},
-    "Media": {"swaps": 12, "dur_ms": 360.0},
-    "Difícil": {"swaps": 18, "dur_ms": 300.0},
-}
-diff_names = list(difficulties.keys())
-diff_index = 1  # Media por defecto
+# La fuente que trae pygame (Font(None)): es la misma que devolvía SysFont(None, ...), pero
+# sin recorrer las fuentes del sistema. Una por tamaño en píxeles (cambia con la ventana),
+# guardadas en 'rasters'
+def fuente(px):
+    px = max(px, 6)
+    return rasters.obtener(("fuente", px), pygame.font.Font, None, px)
+# Todas las superficies de texto pasan por la caché (sin rasterizar glifos en frames estables)
+textos = CacheTextos(maximo=128)
+_font_error = None  # fuente del overlay de errores en web (se crea una vez)
+_overlay_error = None  # (traza, superficie) del último overlay de errores en web
 
 # --- Sonidos (fallback silencioso) ---
-mix_snd = None
-ok_snd = None
-fail_snd = None
-# En web, evitar inicializar mixer para prevenir bloqueos por políticas de audio
-if not IS_WEB:
-    try:
-        pygame.mixer.init()
-        try:
-            mix_snd = pygame.mixer.Sound(str(BASE_DIR / "assets" / "sounds" / "mix.wav"))
-        except Exception:
-            mix_snd = None
-        try:
-            ok_snd = pygame.mixer.Sound(str(BASE_DIR / "assets" / "sounds" / "success.wav"))
-        except Exception:
-            ok_snd = None
-        try:
-            fail_snd = pygame.mixer.Sound(str(BASE_DIR / "assets" / "sounds" / "fail.wav"))
-        except Exception:
-            fail_snd = None
-    except Exception:
-        pass
-
-# --- Modo trampa (mostrar bola durante mezcla encima de los vasos) ---
-modo_trampa = False
+# audio.MotorAudio: mixer con buffer pequeño, WAV predecodificados y canales reservados por
+# categoría. No se abre al arrancar (abrir el dispositivo puede costar decenas de ms) ni con el
+# primer sonido (que llega en mitad de Juego.paso y pararía ese frame): se abre con el primer
+# clic o tecla, que en web es además lo único que deja el navegador, y los WAV se decodifican
+# después en segundo plano. Las estadísticas (voces, descartes, latencia) salen en el overlay F3
+audio = MotorAudio(BASE_DIR / "assets" / "sounds")
+# Cola aparte para los sonidos: no cuentan en la barra de progreso de los sprites
+cargador_audio = Cargador(web=IS_WEB)
+
+def recibir_assets():
+    # Cambia en caliente los assets que hayan llegado desde el último frame
+    for nombre, snd in cargador_audio.recoger():
+        audio.poner(nombre, snd)
+    aplicados = 0
+    for (global_, nombre, tam), valor in cargador.recoger():
+        # Sprite rasterizado para un tamaño; si la ventana ya tiene otro se descarta (no
+        # se guarda en 'rasters', donde echaría fuera fuentes y sprites que sí se usan)
+        if valor is None or disp.tams[nombre] != tam:
+            continue
+        rasters.put((nombre, tam), valor)
+        globals()[global_] = valor
+        aplicados += 1
+    if not aplicados:
+        return
+    construir_atlas()
+    # Fondo y vasos cambian de aspecto sin cambiar de clave: repintar todo una vez
+    capa_fondo.invalidar()
+    escena.invalidar()
+
+def _sonar(nombre):
+    # Nunca abre ni decodifica aquí: sin mixer (o sin ese WAV aún) el sonido no suena
+    if audio.iniciado:
+        audio.sonar(nombre)
+
+def desbloquear_audio():
+    # Con el primer gesto solo se abre el mixer (sin decodificar nada); cada sonido llega
+    # por cargador_audio unos frames después y, hasta entonces, ese sonido simplemente no suena
+    if audio.iniciado:
+        return
+    t0 = perf_counter()
+    if audio.iniciar(decodificar=False):
+        for nombre in audio.config:
+            cargador_audio.pedir(nombre, audio.decodificar, nombre)
+    arranque.diferidos["audio"] = (perf_counter() - t0) * 1000.0
+
+# --- Estado del juego ---
+# Las reglas viven en motor.Juego (sin pygame); este módulo es la vista
+juego = Juego(mesa, oyente=_sonar)
+# La lógica avanza a paso fijo (120 Hz) y el dibujo interpola entre los dos últimos pasos
+paso_fijo = PasoFijo()
 
 # Rects UI (se recalculan al dibujar)
 _btn_rect_cache = pygame.Rect(0, 0, 0, 0)
@@ -197,8 +205,63 @@ _diff_left_rect = pygame.Rect(0, 0, 0, 0)
 _diff_right_rect = pygame.Rect(0, 0, 0, 0)
 _diff_val_rect = pygame.Rect(0, 0, 0, 0)
 
-# --- Función para dibujar todo ---
-def dibujar():
+# --- Atlas de sprites ---
+# Vasos, bola, flechas y marco del botón en una sola superficie (render.Atlas). Las formas
+# de reserva (sin imagen o en web) se prerenderizan aquí, así que dibujar() no llama a
+# pygame.draw por cada vaso o bola: todo es un blit de una región del atlas. Se reconstruye
+# al llegar un asset o al cambiar el tamaño de la ventana.
+atlas = Atlas()
+
+def _forma(tam, pintar, *args, **kwargs):
+    surf = pygame.Surface(tam, pygame.SRCALPHA)
+    pintar(surf, *args, **kwargs)
+    return surf
+
+def _draw_cup_debug(surf, rect):
+    pygame.draw.rect(surf, (200, 200, 200), rect, width=0, border_radius=12)
+    pygame.draw.rect(surf, (50, 50, 50), rect, width=2, border_radius=12)
+
+def _pintar_boton(surf, rect):
+    pygame.draw.rect(surf, (240, 240, 240), rect, border_radius=10)
+    pygame.draw.rect(surf, (50, 50, 50), rect, width=2, border_radius=10)
+
+def _circulo(r, color):
+    return _forma((2 * r, 2 * r), pygame.draw.circle, color, (r, r), r)
+
+def construir_atlas():
+    vaso_rect = pygame.Rect(0, 0, VASO_W, VASO_H)
+    if WEB_DEBUG:
+        vaso = _forma(vaso_rect.size, _draw_cup_debug, vaso_rect)
+    elif vaso_img is not None:
+        vaso = vaso_img
+    else:
+        vaso = _forma(vaso_rect.size, pygame.draw.rect, (180, 180, 180), vaso_rect, border_radius=12)
+    # Las flechas incluyen la columna/fila del borde derecho/inferior (de ahí el +1)
+    f = FLECHA
+    sprites = {
+        "vaso": vaso,
+        "bola_roja": _circulo(BOLA_R, (255, 50, 50)),
+        "bola_trampa": _circulo(BOLA_R, (255, 200, 50)),
+        "bola_menu": _circulo(int(round(20 * vista.factor * K)), (255, 50, 50)),
+        "flecha_izq": _forma((f + 1, f + 1), pygame.draw.polygon, (230, 230, 230), [(f, 0), (0, f // 2), (f, f)]),
+        "flecha_der": _forma((f + 1, f + 1), pygame.draw.polygon, (230, 230, 230), [(0, 0), (f, f // 2), (0, f)]),
+        "boton": _forma((S(200), S(60)), _pintar_boton, pygame.Rect(0, 0, S(200), S(60))),
+    }
+    if bola_img is not None and not WEB_DEBUG:
+        sprites["bola"] = bola_img
+    atlas.construir(sprites)
+
+def _bola(reserva):
+    # Región de la bola: el sprite si lo hay, si no la forma de reserva indicada
+    return "bola" if "bola" in atlas else reserva
+
+# --- Capa estática: fondo + HUD + selector de dificultad + botón ---
+# Se pinta una vez y solo se reconstruye al cambiar estado, puntuación o dificultad.
+# Ninguno de sus elementos se solapa con vasos ni bola, así que puede ir por debajo.
+def _pintar_capa_fondo(surf):
+    global _diff_left_rect, _diff_right_rect, _diff_val_rect, _btn_rect_cache
+    estado = juego.estado
+    componentes = []
     # Fondo
     if WEB_DEBUG:
         # Colores por estado para diagnóstico rápido en web
@@ -210,129 +273,39 @@ def dibujar():
             ESTADO_REVELA: (220, 200, 60),     # amarillo
             ESTADO_FIN: (60, 180, 80),         # verde
         }.get(estado, (30, 30, 30))
-        pantalla.fill(bg)
+        surf.fill(bg)
+        componentes.append((("fondo", bg), surf.get_rect()))
     else:
         if fondo is not None:
-            pantalla.blit(fondo, (0, 0))
+            surf.blit(fondo, (0, 0))
         else:
-            pantalla.fill((20, 90, 20))
-
-    # Dibuja los vasos; si with_lift y el vaso tiene la bola en MEZCLA, hace un pequeño "salto"
-    def draw_cups(with_lift=True):
-        for i, v in enumerate(vasos):
-            vx, vy = v["x"], v["y"]
-            lift = 0.0
-            if with_lift and estado == ESTADO_MEZCLA and swapping and (i == swap_i1 or i == swap_i2) and i == indice_bola:
-                p = max(0.0, min(1.0, swap_t / swap_duracion))
-                lift = -12.0 * SCALE * math.sin(math.pi * p)
-            draw_pos = (int(vx), int(vy + lift))
-            if WEB_DEBUG:
-                pygame.draw.rect(pantalla, (200, 200, 200), pygame.Rect(draw_pos[0], draw_pos[1], VASO_W, VASO_H), width=0, border_radius=12)
-                pygame.draw.rect(pantalla, (50, 50, 50), pygame.Rect(draw_pos[0], draw_pos[1], VASO_W, VASO_H), width=2, border_radius=12)
-            else:
-                if vaso_img is not None:
-                    pantalla.blit(vaso_img, draw_pos)
-                else:
-                    pygame.draw.rect(pantalla, (180, 180, 180), pygame.Rect(draw_pos[0], draw_pos[1], VASO_W, VASO_H), border_radius=12)
-
-    # Calcula la posición de la bola ligada al vaso que la contiene
-    def compute_ball_pos():
-        # Posición estándar ligada al vaso de la bola
-        base_x = vasos[indice_bola]["x"]
-        base_y = vasos[indice_bola]["y"]
-        bx = int(base_x) + S(55)
-        by = int(base_y) + S(100)
-        # Durante mezcla, si el vaso con bola está en swap, mover sincronizado con el vaso (sin retardo) y con ligero rebote
-        if estado == ESTADO_MEZCLA and swapping and (indice_bola == swap_i1 or indice_bola == swap_i2):
-            # Obtener inicio/objetivo del vaso de la bola
-            if indice_bola == swap_i1:
-                start = swap_inicio_1
-                target = swap_objetivo_1
-            else:
-                start = swap_inicio_2
-                target = swap_objetivo_2
-            p = max(0.0, min(1.0, swap_t / swap_duracion))
-            p_ease = 0.5 - 0.5 * math.cos(math.pi * p)
-            bx = int(start[0] + (target[0] - start[0]) * p_ease) + S(55)
-            by = int(start[1] + (target[1] - start[1]) * p_ease) + S(100)
-            # Rebote suave (solo vertical, muy sutil)
-            lift_ball = -10.0 * SCALE * math.sin(math.pi * p_ease)
-            by = int(by + lift_ball)
-        return bx, by
-
-    if estado == ESTADO_MEZCLA:
-        # Durante la mezcla la bola NO debe verse normalmente. Solo animamos los vasos.
-        draw_cups(with_lift=True)
-        # Modo trampa: dibujar la bola por ENCIMA de los vasos para mostrar su posición real
-        if modo_trampa or WEB_DEBUG:
-            i = indice_bola
-            # Centrar la bola sobre el vaso actual
-            if bola_img is not None and not WEB_DEBUG:
-                bw, bh = bola_img.get_size()
-                bx = int(vasos[i]["x"]) + (VASO_W - bw) // 2
-                by = int(vasos[i]["y"]) + (VASO_H - bh) // 2
-                pantalla.blit(bola_img, (bx, by))
-            else:
-                r = S(20)
-                bx = int(vasos[i]["x"]) + (VASO_W - 2 * r) // 2
-                by = int(vasos[i]["y"]) + (VASO_H - 2 * r) // 2
-                pygame.draw.circle(pantalla, (255, 200, 50), (bx + r, by + r), r)
-    elif estado == ESTADO_BAJAR:
-        # Solo vasos descendiendo desde arriba; no mostrar bola
-        draw_cups(with_lift=False)
-    elif estado == ESTADO_MENU:
-        # En menú: bola DETRÁS (debajo) de los vasos para que éstos queden por delante
-        # Posicionar la bola centrada bajo el vaso elegido y alineada a BALL_MENU_Y
-        target_x, _ = vasos_pos_inicial_top[indice_bola]
-        if bola_img is not None and not WEB_DEBUG:
-            bw, bh = bola_img.get_size()
-            bx = int(target_x + (VASO_W - bw) / 2)
-            by = int(BALL_MENU_Y)
-            pantalla.blit(bola_img, (bx, by))
-        else:
-            r = 20
-            bx = int(target_x + (VASO_W - 2 * r) / 2)
-            by = int(BALL_MENU_Y)
-            pygame.draw.circle(pantalla, (255, 50, 50), (bx + r, by + r), r)
-        # Dibujar vasos por delante
-        draw_cups(with_lift=False)
-    else:
-        # Otros estados: dibujar vasos y, si corresponde, la bola por encima
-        draw_cups(with_lift=False)
-        if estado in (ESTADO_MOSTRAR, ESTADO_REVELA):
-            bx, by = compute_ball_pos()
-            if bola_img is not None and not WEB_DEBUG:
-                pantalla.blit(bola_img, (bx, by))
-            else:
-                pygame.draw.circle(pantalla, (255, 50, 50), (bx + S(20), by + S(20)), S(20))
-
-    # Dibujar mensaje si existe (más abajo) y aún más bajo en el menú
-    if mensaje:
-        surf = font.render(mensaje, True, (255, 255, 255))
-        msg_y = 180 if estado != ESTADO_MENU else 240
-        rect = surf.get_rect(center=(ANCHO // 2, msg_y))
-        pantalla.blit(surf, rect)
+            surf.fill((20, 90, 20))
 
     # HUD con marcador (esquina superior izquierda)
-    hud = font_small.render(f"Puntos: {score}  Ronda: {rounds}", True, (230, 230, 230))
-    pantalla.blit(hud, (16, 16))
+    hud_txt = f"Puntos: {juego.score}  Ronda: {juego.rounds}"
+    if juego.maraton:
+        hud_txt += f"  Maratón: {juego.racha}"
+    hud = textos.render(font_small, hud_txt, (230, 230, 230))
+    componentes.append((("hud", hud_txt), surf.blit(hud, (16, 16))))
 
     # Dificultad en esquina superior derecha (visible SIEMPRE; clic/teclas solo en MENÚ/FIN)
-    diff_label = font_small.render("Dificultad:", True, (230, 230, 230))
+    diff_label = textos.render(font_small, "Dificultad:", (230, 230, 230))
     # Mover el bloque de dificultad hacia la izquierda proporcionalmente
-    label_rect = diff_label.get_rect(topright=(ANCHO - S(260), S(10)))
-    pantalla.blit(diff_label, label_rect)
+    label_rect = diff_label.get_rect(topright=(LIENZO_W - S(260), S(10)))
+    surf.blit(diff_label, label_rect)
     # Flechas y valor a la derecha de la palabra 'Dificultad'
     row_y = label_rect.centery - S(12)
-    left_rect = pygame.Rect(label_rect.right + S(8), row_y, S(24), S(24))
-    diff_val_surf = font.render(diff_names[diff_index], True, (255, 255, 0))
+    left_rect = pygame.Rect(label_rect.right + S(8), row_y, FLECHA, FLECHA)
+    diff_val_surf = textos.render(font, diff_names[juego.diff_index], (255, 255, 0))
     diff_val_rect = diff_val_surf.get_rect(midleft=(left_rect.right + S(8), left_rect.centery))
-    right_rect = pygame.Rect(diff_val_rect.right + S(8), row_y, S(24), S(24))
-    pygame.draw.polygon(pantalla, (230, 230, 230), [(left_rect.right, left_rect.top), (left_rect.left, left_rect.centery), (left_rect.right, left_rect.bottom)])
-    pygame.draw.polygon(pantalla, (230, 230, 230), [(right_rect.left, right_rect.top), (right_rect.right, right_rect.centery), (right_rect.left, right_rect.bottom)])
-    pantalla.blit(diff_val_surf, diff_val_rect)
+    right_rect = pygame.Rect(diff_val_rect.right + S(8), row_y, FLECHA, FLECHA)
+    surf.blits((
+        (atlas.superficie, left_rect.topleft, atlas.areas["flecha_izq"]),
+        (atlas.superficie, right_rect.topleft, atlas.areas["flecha_der"]),
+        (diff_val_surf, diff_val_rect),
+    ), doreturn=False)
+    componentes.append((("dificultad", juego.diff_index), label_rect.union(right_rect.inflate(2, 2)).union(diff_val_rect)))
     # Guardar rects solo si estamos en MENÚ/FIN, para permitir clic
-    global _diff_left_rect, _diff_right_rect, _diff_val_rect
     if estado in (ESTADO_MENU, ESTADO_FIN):
         _diff_left_rect = left_rect
         _diff_right_rect = right_rect
@@ -345,230 +318,420 @@ def dibujar():
     # Botones (menú/fin)
     if estado in (ESTADO_MENU, ESTADO_FIN):
         # Botón Reintentar/Comenzar
-        btn_text = "Comenzar" if estado == ESTADO_MENU else "Reintentar"
-        btn_surf = font.render(btn_text, True, (0, 0, 0))
-        btn_rect = pygame.Rect(ANCHO // 2 - S(100), ALTO - S(120), S(200), S(60))
-        pygame.draw.rect(pantalla, (240, 240, 240), btn_rect, border_radius=10)
-        pygame.draw.rect(pantalla, (50, 50, 50), btn_rect, width=2, border_radius=10)
-        pantalla.blit(btn_surf, btn_surf.get_rect(center=btn_rect.center))
+        if estado == ESTADO_MENU:
+            btn_text = "Comenzar"
+        else:
+            btn_text = "Seguir" if juego.maraton and juego.racha else "Reintentar"
+        btn_surf = textos.render(font, btn_text, (0, 0, 0))
+        btn_rect = pygame.Rect(LIENZO_W // 2 - S(100), LIENZO_H - S(120), S(200), S(60))
+        surf.blit(atlas.superficie, btn_rect, atlas.areas["boton"])
+        surf.blit(btn_surf, btn_surf.get_rect(center=btn_rect.center))
+        componentes.append((("boton", btn_text), btn_rect))
         # Guardar rect del botón para clics
-        global _btn_rect_cache
         _btn_rect_cache = btn_rect
 
-    # HUD de depuración en WEB: estado y guías visuales
+    # Guías visuales de depuración en WEB: borde del canvas y estado en grande
     if WEB_DEBUG:
-        debug_txt = f"WEB Estado: {estado}  FPS~{int(reloj.get_fps())}  Bola:{indice_bola}"
-        dbg = font_small.render(debug_txt, True, (255, 80, 80))
-        pantalla.blit(dbg, (16, ALTO - 28))
-        # Borde del canvas
-        pygame.draw.rect(pantalla, (255, 0, 0), pygame.Rect(0, 0, ANCHO, ALTO), width=2)
-        # Texto grande centrado con el estado
-        title = font.render(estado, True, (255, 255, 255))
-        pantalla.blit(title, title.get_rect(center=(ANCHO//2, 60)))
+        pygame.draw.rect(surf, (255, 0, 0), surf.get_rect(), width=2)
+        title = textos.render(font, estado, (255, 255, 255))
+        title_rect = title.get_rect(center=(LIENZO_W // 2, int(60 * K)))
+        surf.blit(title, title_rect)
+        componentes.append((("titulo", estado), title_rect))
+    return componentes
+
+capa_fondo = CapaEstatica((ANCHO, ALTO), _pintar_capa_fondo)
+
+# --- Disposición por resolución ---
+# Todo lo que depende del tamaño de la ventana se calcula una vez por tamaño y se guarda
+# en una tabla: el rectángulo del lienzo, K (píxeles de lienzo por píxel lógico), la
+# geometría de la mesa a esa escala (motor.Mesa sobre el lienzo: vasos, bola del menú,
+# botones), los tamaños de sprite y las alturas de los mensajes. En cada frame dibujar()
+# solo multiplica por K las posiciones del motor; no escala sprites ni fuentes.
+Disposicion = namedtuple("Disposicion", "rect k vista tams fuentes mensaje_y")
+disposiciones = CacheRaster(maximo=8)  # (ancho, alto) de ventana -> Disposicion
+
+def _mensaje_menu_y(vista, k):
+    # Con una fila, a media altura (por encima de las bolas); con varias filas la rejilla llega
+    # ahí, así que va entre la última fila de bolas y el botón
+    if vista.filas == 1:
+        return int(240 * k)
+    return (vista.ball_menu_y + 2 * vista.bola_r + vista.alto - vista.S(120)) // 2
+
+def _disposicion(ancho, alto):
+    k = min(ancho / ANCHO, alto / ALTO)
+    w, h = max(1, int(round(ANCHO * k))), max(1, int(round(ALTO * k)))
+    k = w / ANCHO
+    vista = Mesa(w, h, N_VASOS)
+    return Disposicion(
+        rect=pygame.Rect((ancho - w) // 2, (alto - h) // 2, w, h),
+        k=k,
+        vista=vista,
+        tams=tamanos_sprites(w, h, vista.factor),
+        fuentes=(vista.S(36), vista.S(28)),
+        mensaje_y=(int(180 * k), _mensaje_menu_y(vista, k)),  # en juego / en el menú
+    )
+
+def aplicar_ventana(ancho, alto):
+    # Cambia a la disposición del tamaño dado; el repintado completo limpia las bandas
+    global disp, vista, K, S, LIENZO_W, LIENZO_H, VASO_W, VASO_H, BOLA_R, FLECHA, font, font_small, lienzo, pantalla
+    pantalla = pygame.display.get_surface()
+    ancho, alto = max(ancho, VENTANA_MIN[0]), max(alto, VENTANA_MIN[1])
+    ancho, alto = min(ancho, pantalla.get_width()), min(alto, pantalla.get_height())
+    disp = disposiciones.obtener((ancho, alto), _disposicion, ancho, alto)
+    vista = disp.vista
+    K = disp.k
+    S = vista.S
+    LIENZO_W, LIENZO_H = disp.rect.size
+    VASO_W, VASO_H = vista.vaso_w, vista.vaso_h
+    BOLA_R = vista.bola_r
+    FLECHA = S(24)
+    font, font_small = fuente(disp.fuentes[0]), fuente(disp.fuentes[1])
+    pantalla.fill((0, 0, 0))
+    lienzo = pantalla.subsurface(disp.rect)
+    escena.cambiar_superficie(lienzo)
+    capa_fondo.redimensionar(disp.rect.size)
+    pedir_sprites(disp.tams, guardar=disp.rect.size == (ANCHO, ALTO))
+    construir_atlas()
+
+def alternar_pantalla_completa():
+    global pantalla, pantalla_completa, _tam_ventana
+    if IS_WEB:
+        return
+    pantalla_completa = not pantalla_completa
+    if renderer is not None:
+        # No se recrea la ventana (se perdería el Renderer): SDL cambia el modo y reescala
+        try:
+            pygame.display.toggle_fullscreen()
+        except pygame.error:
+            pantalla_completa = not pantalla_completa  # el driver de vídeo no lo admite
+        escena.invalidar()
+        return
+    if pantalla_completa:
+        _tam_ventana = pygame.display.get_surface().get_size()
+        pantalla = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+    else:
+        pantalla = pygame.display.set_mode(_tam_ventana, pygame.RESIZABLE)
+    aplicar_ventana(*pantalla.get_size())
 
-    pygame.display.flip()
+arranque.marcar("assets_pedidos")
+aplicar_ventana(*pantalla.get_size())
+arranque.marcar("disposicion")
 
-# --- Bucle principal (desktop/web) ---
-seleccion = None
+# --- Función para dibujar todo ---
+# Cada elemento se registra en 'escena' con una clave (qué se ve y dónde) y su rectángulo;
+# Escena.presentar() repinta y envía a pantalla solo las zonas que han cambiado
+def dibujar():
+    add_blit = escena.add_blit
+    estado = juego.estado
+    vasos_x, vasos_y = paso_fijo.posiciones(juego)
+    indice_bola = juego.indice_bola
+    sup_atlas = atlas.superficie
+    areas = atlas.areas
+    # Capa estática (un solo blit); se reconstruye solo si cambia alguno de estos valores
+    escena.add_capa("capa_fondo", capa_fondo.obtener((estado, juego.score, juego.rounds, juego.diff_index, juego.maraton, juego.racha)))
+
+    # Dibuja los vasos; si with_lift y el vaso tiene la bola en MEZCLA, hace un pequeño "salto"
+    def draw_cups(with_lift=True):
+        lift_bola = paso_fijo.lift_bola(juego) if with_lift else 0.0
+        area = areas["vaso"]
+        tam = area.size
+        for i, (vx, vy) in enumerate(zip(vasos_x, vasos_y)):
+            lift = lift_bola if i == indice_bola else 0.0
+            draw_pos = (int(vx * K), int((vy + lift) * K))
+            add_blit(("vaso", i, draw_pos), pygame.Rect(draw_pos, tam), sup_atlas, draw_pos, area)
+
+    # Bola (sprite o forma de reserva del atlas) con la esquina superior izquierda en (bx, by)
+    def draw_ball(bx, by, nombre):
+        area = areas[nombre]
+        add_blit(("bola", bx, by, nombre), pygame.Rect((bx, by), area.size), sup_atlas, (bx, by), area)
 
-def handle_events():
-    global jugando, estado, seleccion, mensaje, indice_bola, swap_queue, swapping, bajar_t, score, rounds, diff_index, modo_trampa
-    for event in pygame.event.get():
+    if estado == ESTADO_MEZCLA:
+        # Durante la mezcla la bola NO debe verse normalmente. Solo animamos los vasos.
+        draw_cups(with_lift=True)
+        # Modo trampa: dibujar la bola por ENCIMA de los vasos para mostrar su posición real
+        if juego.modo_trampa or WEB_DEBUG:
+            i = indice_bola
+            # Centrar la bola sobre el vaso actual
+            nombre = _bola("bola_trampa")
+            bw, bh = areas[nombre].size
+            bx = int(vasos_x[i] * K) + (VASO_W - bw) // 2
+            by = int(vasos_y[i] * K) + (VASO_H - bh) // 2
+            draw_ball(bx, by, nombre)
+    elif estado == ESTADO_BAJAR:
+        # Solo vasos descendiendo desde arriba; no mostrar bola
+        draw_cups(with_lift=False)
+    elif estado == ESTADO_MENU:
+        # En menú: bola DETRÁS (debajo) de los vasos para que éstos queden por delante
+        # Posicionar la bola centrada bajo el vaso elegido y alineada a ball_menu_y
+        target_x, _ = vista.pos_top[indice_bola]
+        by = int(vista.bola_menu_y(indice_bola))
+        nombre = _bola("bola_menu")
+        bw = areas[nombre].w
+        bx = int(target_x + (VASO_W - bw) / 2)
+        draw_ball(bx, by, nombre)
+        # Dibujar vasos por delante
+        draw_cups(with_lift=False)
+    else:
+        # Otros estados: dibujar vasos y, si corresponde, la bola por encima
+        draw_cups(with_lift=False)
+        if estado in (ESTADO_MOSTRAR, ESTADO_REVELA):
+            bx, by = juego.pos_bola()
+            draw_ball(int(bx * K), int(by * K), _bola("bola_roja"))
+
+    # Barra de progreso mientras llegan assets en segundo plano
+    if cargador.pendiente():
+        total = cargador.total
+        hechos = cargador.hechos
+        barra = pygame.Rect(0, LIENZO_H - S(6), LIENZO_W * hechos // total, S(6))
+        escena.add_rect(("carga", hechos, total), barra, (240, 200, 60))
+
+    # Dibujar mensaje si existe (más abajo) y aún más bajo en el menú
+    mensaje = juego.mensaje
+    if mensaje:
+        surf = textos.render(font, mensaje, (255, 255, 255))
+        msg_y = disp.mensaje_y[estado == ESTADO_MENU]
+        rect = surf.get_rect(center=(LIENZO_W // 2, msg_y))
+        add_blit(("mensaje", mensaje, rect.topleft), rect, surf, rect)
+
+    # Overlay del perfilador: p50/p95/p99 por fase para el estado actual
+    if perfil.activo:
+        for k, linea in enumerate(perfil.lineas(estado)):
+            surf = textos.render(font_small, linea, (255, 255, 120))
+            pos = (16, 44 + k * S(22))
+            add_blit(("perfil", k, linea), surf.get_rect(topleft=pos), surf, pos)
+        if audio.activo:
+            linea = audio.linea()
+            surf = textos.render(font_small, linea, (255, 255, 120))
+            pos = (16, 44 + (k + 1) * S(22))
+            add_blit(("perfil", "audio", linea), surf.get_rect(topleft=pos), surf, pos)
+
+    # HUD de depuración en WEB (cambia con los FPS, no va en la capa estática)
+    if WEB_DEBUG:
+        debug_txt = f"WEB Estado: {estado}  FPS~{int(planificador.fps())}  Bola:{indice_bola}"
+        dbg = textos.render(font_small, debug_txt, (255, 80, 80))
+        pos = (16, LIENZO_H - 28)
+        add_blit(("debug", debug_txt), dbg.get_rect(topleft=pos), dbg, pos)
+
+    escena.presentar()
+
+# --- Bucle principal (desktop/web) ---
+# handle_events traduce eventos de pygame a acciones de juego; update_logic avanza el motor
+# a paso fijo con el tiempo real del frame
+def handle_events(eventos=None):
+    global jugando
+    nuevo_tam = None
+    for event in (pygame.event.get() if eventos is None else eventos):
         if event.type == pygame.QUIT:
             jugando = False
+        # Primer gesto del usuario (p. ej. el clic en "Comenzar"): se abre el audio antes de que
+        # haga falta (en web, además, el navegador no lo deja abrir fuera de un gesto)
+        if not audio.iniciado and event.type in (pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN, pygame.FINGERDOWN):
+            desbloquear_audio()
+
+        # Ventana descubierta o restaurada: lo que había en pantalla ya no es válido
+        if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWSIZECHANGED):
+            escena.invalidar()
+        # En web, con la ventana oculta o minimizada el planificador deja de dibujar
+        if IS_WEB and event.type in (pygame.WINDOWHIDDEN, pygame.WINDOWMINIMIZED):
+            planificador.ventana_oculta = True
+        elif IS_WEB and event.type in (pygame.WINDOWSHOWN, pygame.WINDOWRESTORED, pygame.WINDOWEXPOSED):
+            planificador.ventana_oculta = False
+        # Al arrastrar el borde llegan muchos; solo se aplica el último del frame
+        if event.type == pygame.VIDEORESIZE:
+            nuevo_tam = event.size
 
         if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_r and estado == ESTADO_FIN:
+            if event.key == pygame.K_r and juego.estado == ESTADO_FIN:
                 # Volver al MENÚ (bola visible) y reiniciar posiciones arriba
-                for i, (x, y) in enumerate(vasos_pos_inicial_top):
-                    vasos[i]["x"], vasos[i]["y"] = float(x), float(y)
-                indice_bola = random.randint(0, 2)
-                estado = ESTADO_MENU
-                seleccion = None
-                mensaje = "Elige dificultad y pulsa Comenzar"
-                swap_queue.clear()
-                swapping = False
+                juego.volver_menu()
             # Modo trampa
             if event.key == pygame.K_t:
-                modo_trampa = not modo_trampa
-            # Cambiar dificultad en menú/fin usando teclado (UI superior derecha eliminada)
-            if estado in (ESTADO_MENU, ESTADO_FIN):
-                if event.key == pygame.K_LEFT:
-                    diff_index = (diff_index - 1) % len(diff_names)
-                elif event.key == pygame.K_RIGHT:
-                    diff_index = (diff_index + 1) % len(diff_names)
-
-        if event.type == pygame.MOUSEBUTTONDOWN and estado == ESTADO_ESPERA_CLIC:
-            x, y = event.pos
-            for i, v in enumerate(vasos):
-                rect = pygame.Rect(int(v["x"]), int(v["y"]), VASO_W, VASO_H)
-                if rect.collidepoint(x, y):
-                    seleccion = i
-                    if i == indice_bola:
-                        mensaje = "Has acertado! Pulsa R para jugar de nuevo"
-                        score += 1
-                        if ok_snd: ok_snd.play()
-                    else:
-                        mensaje = "Has fallado. Pulsa R para jugar de nuevo"
-                        if fail_snd: fail_snd.play()
-                    estado = ESTADO_REVELA
-                    rounds += 1
-                    break
+                juego.alternar_trampa()
+            # Maratón (solo en MENÚ)
+            if event.key == pygame.K_m:
+                juego.alternar_maraton()
+            # Perfilador: mostrar/ocultar y exportar
+            if event.key == pygame.K_F3:
+                escena.medir = perfil.alternar()
+            elif event.key == pygame.K_F4:
+                print("Perfil exportado:", *perfil.exportar())
+                if audio.activo:
+                    print("Audio:", audio.estadisticas())
+            # Cambiar dificultad en menú/fin usando teclado
+            if event.key == pygame.K_LEFT:
+                juego.cambiar_dificultad(-1)
+            elif event.key == pygame.K_RIGHT:
+                juego.cambiar_dificultad(+1)
+            if event.key == pygame.K_F11:
+                alternar_pantalla_completa()
+                nuevo_tam = None
+
+        if event.type != pygame.MOUSEBUTTONDOWN:
+            continue
+        # Coordenadas del lienzo (botones y flechas); los vasos van en coordenadas lógicas
+        x, y = event.pos[0] - disp.rect.x, event.pos[1] - disp.rect.y
+
+        if juego.estado == ESTADO_ESPERA_CLIC:
+            juego.elegir(juego.vaso_en(x / K, y / K))
 
         # Clic en botón o en flechas de dificultad (menú/fin)
-        if event.type == pygame.MOUSEBUTTONDOWN and estado in (ESTADO_MENU, ESTADO_FIN):
-            x, y = event.pos
-            btn_rect = _btn_rect_cache
+        if juego.estado in (ESTADO_MENU, ESTADO_FIN):
             if _diff_left_rect.collidepoint(x, y) or (_diff_val_rect.collidepoint(x, y) and x < _diff_val_rect.centerx):
-                diff_index = (diff_index - 1) % len(diff_names)
+                juego.cambiar_dificultad(-1)
             elif _diff_right_rect.collidepoint(x, y) or (_diff_val_rect.collidepoint(x, y) and x >= _diff_val_rect.centerx):
-                diff_index = (diff_index + 1) % len(diff_names)
-            if btn_rect.collidepoint(x, y):
-                if estado == ESTADO_MENU:
-                    # Comenzar: animación de bajada
-                    for i, (px, py) in enumerate(vasos_pos_inicial_top):
-                        vasos[i]["x"], vasos[i]["y"] = float(px), float(py)
-                    # mantener la misma posicion de la bola que se mostró en el menú
-                    estado = ESTADO_BAJAR
-                    bajar_t = 0.0
-                    seleccion = None
-                    mensaje = ""
-                    swap_queue.clear()
-                    swapping = False
-                else:
-                    # En FIN: volver a MENÚ (bola visible) en lugar de comenzar directo
-                    for i, (px, py) in enumerate(vasos_pos_inicial_top):
-                        vasos[i]["x"], vasos[i]["y"] = float(px), float(py)
-                    indice_bola = random.randint(0, 2)
-                    estado = ESTADO_MENU
-                    seleccion = None
-                    mensaje = "Elige dificultad (←/→) y pulsa Comenzar"
+                juego.cambiar_dificultad(+1)
+            if _btn_rect_cache.collidepoint(x, y):
+                juego.pulsar_boton()
+    if nuevo_tam is not None:
+        aplicar_ventana(*nuevo_tam)
+
+def _fin_arranque():
+    arranque.terminar()
+    if MOSTRAR_ARRANQUE:
+        print(arranque.texto())
 
 def update_logic(dt):
-    global estado, mensaje, swap_queue, swapping, swap_i1, swap_i2, swap_t, swap_inicio_1, swap_inicio_2, swap_objetivo_1, swap_objetivo_2, bajar_t, score, rounds, swap_duracion
-    # Lógica de estados
-    if estado == ESTADO_MENU:
-        # Mensaje simple de menú (sin paréntesis)
-        mensaje = "Elige dificultad y pulsa Comenzar"
-        # Nada más; espera interacción
-    elif estado == ESTADO_BAJAR:
-        # Interpolar posiciones desde top a juego
-        bajar_t += dt
-        p = max(0.0, min(1.0, bajar_t / bajar_duracion))
-        p_ease = 0.5 - 0.5 * math.cos(math.pi * p)
-        for i in range(3):
-            sx, sy = bajar_inicio[i]
-            tx, ty = bajar_objetivo[i]
-            vasos[i]["x"] = sx + (tx - sx) * p_ease
-            vasos[i]["y"] = sy + (ty - sy) * p_ease
-        if bajar_t >= bajar_duracion:
-            # Asegurar posiciones finales
-            for i, (tx, ty) in enumerate(vasos_pos_juego):
-                vasos[i]["x"], vasos[i]["y"] = tx, ty
-            # Saltar fase de mostrar: comenzar mezcla directamente
-            estado = ESTADO_MEZCLA
-            mensaje = "Atento a la mezcla..."
-            swap_queue = []
-            cfg = difficulties[diff_names[diff_index]]
-            num_swaps = cfg["swaps"]
-            swap_duracion = cfg["dur_ms"]
-            for _ in range(num_swaps):
-                i1, i2 = random.sample(range(3), 2)
-                swap_queue.append((i1, i2))
-            swapping = False
-            if mix_snd:
-                mix_snd.play()
-    elif estado == ESTADO_MOSTRAR:
-        timer_ms -= dt
-        if timer_ms <= 0:
-            # Preparar mezcla
-            estado = ESTADO_MEZCLA
-            mensaje = "Atento a la mezcla..."
-            swap_queue = []
-            cfg = difficulties[diff_names[diff_index]]
-            num_swaps = cfg["swaps"]
-            swap_duracion = cfg["dur_ms"]
-            for _ in range(num_swaps):
-                i1, i2 = random.sample(range(3), 2)
-                swap_queue.append((i1, i2))
-            swapping = False
-        # Iniciar sonido de mezcla si existe
-        if mix_snd:
-            mix_snd.play()
-
-    elif estado == ESTADO_MEZCLA:
-        if not swapping and swap_queue:
-            swap_i1, swap_i2 = swap_queue.pop(0)
-            swap_t = 0.0
-            # Capturar posiciones iniciales y objetivos
-            swap_inicio_1 = (vasos[swap_i1]["x"], vasos[swap_i1]["y"])
-            swap_inicio_2 = (vasos[swap_i2]["x"], vasos[swap_i2]["y"])
-            swap_objetivo_1 = swap_inicio_2
-            swap_objetivo_2 = swap_inicio_1
-            swapping = True
-        elif swapping:
-            swap_t += dt
-            p = max(0.0, min(1.0, swap_t / swap_duracion))
-            # Suavizado (ease-in-out)
-            p_ease = 0.5 - 0.5 * math.cos(math.pi * p)
-            # Interpolación
-            vasos[swap_i1]["x"] = swap_inicio_1[0] + (swap_objetivo_1[0] - swap_inicio_1[0]) * p_ease
-            vasos[swap_i1]["y"] = swap_inicio_1[1] + (swap_objetivo_1[1] - swap_inicio_1[1]) * p_ease
-            vasos[swap_i2]["x"] = swap_inicio_2[0] + (swap_objetivo_2[0] - swap_inicio_2[0]) * p_ease
-            vasos[swap_i2]["y"] = swap_inicio_2[1] + (swap_objetivo_2[1] - swap_inicio_2[1]) * p_ease
-            if swap_t >= swap_duracion:
-                # Asegurar posiciones finales exactas
-                vasos[swap_i1]["x"], vasos[swap_i1]["y"] = swap_objetivo_1
-                vasos[swap_i2]["x"], vasos[swap_i2]["y"] = swap_objetivo_2
-                swapping = False
-        else:
-            # Terminar mezcla
-            estado = ESTADO_ESPERA_CLIC
-            mensaje = "Haz clic en un vaso"
+    paso_fijo.avanzar(juego, dt)
 
-    elif estado == ESTADO_REVELA:
-        # Se muestra la bola y se pasa a FIN (esperando R)
-        estado = ESTADO_FIN
+def frame(dt, eventos=None):
+    # Un frame completo; con el perfilador activo se mide cada fase por separado
+    recibir_assets()
+    if not perfil.activo:
+        handle_events(eventos)
+        update_logic(dt)
+        dibujar()
+        if not arranque.terminado:
+            _fin_arranque()
+        return
+    estado = juego.estado
+    t0 = perf_counter()
+    handle_events(eventos)
+    t1 = perf_counter()
+    update_logic(dt)
+    t2 = perf_counter()
+    dibujar()
+    t3 = perf_counter()
+    envio = escena.t_envio
+    perfil.registrar(estado, t1 - t0, t2 - t1, t3 - t2 - envio, envio)
+
+# --- Reposo ---
+# Sin animación activa (MENÚ, ESPERA_CLIC, FIN) no hace falta iterar a 60 fps: en escritorio
+# se bloquea en pygame.event.wait y en web se cede al navegador durante más tiempo.
+# El timeout mantiene vivos los elementos periódicos (overlay del perfilador, FPS en web).
+ESPERA_REPOSO_MS = 250
+ESPERA_REPOSO_WEB_S = 0.05
+# En web, un paso de lógica y un render por frame del navegador (ver planificador.py)
+planificador = PlanificadorWeb(espera_reposo_s=ESPERA_REPOSO_WEB_S) if IS_WEB else None
 
 def loop_desktop():
     global jugando
     jugando = True
-    clock_fps = 60
     while jugando:
-        dt = reloj.tick(clock_fps)
-        handle_events()
-        update_logic(dt)
+        if juego.animando():
+            dt = reloj.tick(FPS_RENDER)
+            frame(dt)
+            continue
+        # Reposo: bloquear hasta el próximo evento sin gastar CPU
+        ev = pygame.event.wait(ESPERA_REPOSO_MS)
+        eventos = [] if ev.type == pygame.NOEVENT else [ev]
+        eventos += pygame.event.get()
+        # El tiempo en reposo no avanza la lógica (si este clic empieza una animación, arranca desde 0)
+        reloj.tick()
+        frame(0, eventos)
+
+def loop_replay(registros):
+    # Reproduce una grabación en tiempo real con render; el teclado y el ratón se ignoran
+    global jugando
+    jugando = True
+    desbloquear_audio()  # sin gestos que esperar: antes del primer frame grabado
+    for reg in registros:
+        dt = aplicar(juego, reg, paso_fijo)
+        if dt is None:
+            continue
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                jugando = False
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                escena.invalidar()
+            elif event.type == pygame.VIDEORESIZE:
+                aplicar_ventana(*event.size)
+        if not jugando:
+            break
+        recibir_assets()
         dibujar()
+        # Esperar lo que duró el frame original
+        reloj.tick(1000.0 / dt if dt > 0 else 0)
+
+def _mostrar_error(err):
+    # Overlay de errores en web: se compone una vez por traza distinta; mientras el mismo
+    # error se repite en cada frame solo se vuelve a copiar a la pantalla
+    global _font_error, _overlay_error
+    if _overlay_error is None or _overlay_error[0] != err:
+        if _font_error is None:
+            _font_error = pygame.font.Font(None, 22)
+        surf = pygame.Surface(pantalla.get_size())
+        surf.fill((30, 0, 0))
+        y = 20
+        for line in ("EXCEPCION EN WEB:",) + tuple(err.splitlines()[-10:]):
+            surf.blit(_font_error.render(line, True, (255, 200, 200)), (10, y))
+            y += 22
+        _overlay_error = (err, surf)
+    pantalla.blit(_overlay_error[1], (0, 0))
+    pygame.display.flip()
+    escena.invalidar()
 
 async def loop_web():
+    import asyncio  # solo en web: importarlo cuesta decenas de ms del arranque de escritorio
+
     global jugando
     jugando = True
-    clock_fps = 60
+    visible = True
     while jugando:
-        dt = reloj.tick(clock_fps)
+        # Sin Clock.tick: el ritmo lo marca el navegador (sleep(0) espera a su siguiente frame)
+        dt, pintar = planificador.empezar(juego.animando())
         try:
-            handle_events()
-            update_logic(dt)
-            dibujar()
+            if pintar:
+                if not visible:
+                    # Vuelve la pestaña: lo que había en el canvas ya no vale
+                    escena.invalidar()
+                frame(dt)
+            else:
+                # Pestaña oculta: eventos y lógica siguen (PasoFijo limita el salto), sin dibujar
+                recibir_assets()
+                handle_events()
+                update_logic(dt)
+            visible = pintar
         except Exception:
             # Mostrar overlay de error en web para depurar
-            err = traceback.format_exc()
-            pantalla.fill((30, 0, 0))
-            y = 20
-            for line in ("EXCEPCION EN WEB:",) + tuple(err.splitlines()[-10:]):
-                surf = pygame.font.Font(None, 22).render(line, True, (255, 200, 200))
-                pantalla.blit(surf, (10, y))
-                y += 22
-            pygame.display.flip()
-        await asyncio.sleep(0)  # ceder control al navegador
+            _mostrar_error(traceback.format_exc())
+        # Ceder control al navegador: hasta su siguiente frame, o más tiempo en reposo u oculta
+        await asyncio.sleep(planificador.espera(juego.animando()))
 
 async def main():  # entrada esperada por pygbag
     await loop_web()
 
 if __name__ == "__main__" and (not IS_WEB):
-    loop_desktop()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Juego del Trilero")
+    parser.add_argument("--grabar", metavar="ARCHIVO", help="grabar la sesión (semilla, mezclas, dt y acciones)")
+    parser.add_argument("--reproducir", metavar="ARCHIVO", help="reproducir una grabación en tiempo real")
+    args = parser.parse_args()
+    if args.reproducir:
+        juego, _registros = abrir_grabacion(args.reproducir, mesa, _sonar)
+        loop_replay(_registros)
+    else:
+        if args.grabar:
+            # Partida con semilla propia para que la grabación sea reproducible
+            juego = Juego(mesa, semilla=random.randrange(2**63), oyente=_sonar)
+            juego.grabador = Grabador(args.grabar, juego.semilla, juego.diff_index, N_VASOS)
+        loop_desktop()
+        if juego.grabador is not None:
+            juego.grabador.cerrar()
     pygame.quit()
 elif IS_WEB:
+    import asyncio
+
     # Salvaguarda: programa la corrutina por si el runtime no la invoca automáticamente
     try:
         asyncio.get_event_loop().create_task(main())
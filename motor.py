@@ -0,0 +1,603 @@
+"""Reglas del trilero sin pygame: máquina de estados, mezcla y puntuación.
+
+main.py es solo la vista (ventana, dibujo, sonido y traducción de eventos); este
+módulo se puede importar y simular sin ventana, fuentes ni mixer.
+"""
+import heapq
+import math
+import random
+from array import array
+
+from timeline import TABLAS, Linea, Pista, muestrear_tabla
+
+# --- Estados del juego ---
+ESTADO_MENU = "MENU"
+ESTADO_BAJAR = "BAJAR"
+ESTADO_MOSTRAR = "MOSTRAR"
+ESTADO_MEZCLA = "MEZCLA"
+ESTADO_ESPERA_CLIC = "ESPERA_CLIC"
+ESTADO_REVELA = "REVELA"
+ESTADO_FIN = "FIN"
+
+# --- Dificultades disponibles ---
+# La mezcla dura lo que 'swaps' intercambios seguidos de 'dur_ms'; con más de 3 vasos
+# los movimientos sin vasos en común van a la vez, así que caben más en el mismo tiempo.
+# 'ciclos': probabilidad de un ciclo de 3 vasos en lugar de un par.
+# 'curva': desvío en arco (px de diseño) de los pares; los ciclos siempre van en arco.
+difficulties = {
+    "Fácil": {"swaps": 8, "dur_ms": 420.0, "ciclos": 0.0, "curva": 0.0},
+    "Media": {"swaps": 12, "dur_ms": 360.0, "ciclos": 0.0, "curva": 0.0},
+    "Difícil": {"swaps": 18, "dur_ms": 300.0, "ciclos": 0.25, "curva": 40.0},
+}
+diff_names = list(difficulties.keys())
+
+# Diseño base 800x600; todo se escala a la resolución real
+BASE_W, BASE_H = 800, 600
+
+# Número de vasos admitido en la mesa
+MIN_VASOS, MAX_VASOS = 3, 64
+
+
+def rejilla(n: int):
+    # Columnas y filas para n vasos: una sola fila hasta 8, después unas dos columnas por fila
+    cols = n if n <= 8 else math.ceil(math.sqrt(2 * n))
+    return cols, math.ceil(n / cols)
+
+
+class Mesa:
+    """Geometría de la mesa para una resolución: tamaño de vaso y posiciones."""
+
+    def __init__(self, ancho: int, alto: int, n_vasos: int = 3):
+        if not MIN_VASOS <= n_vasos <= MAX_VASOS:
+            raise ValueError(f"n_vasos debe estar entre {MIN_VASOS} y {MAX_VASOS}")
+        self.ancho = ancho
+        self.alto = alto
+        self.scale = min(ancho / BASE_W, alto / BASE_H)
+        self.n_vasos = n_vasos
+        self.cols, self.filas = rejilla(n_vasos)
+        # Separación de diseño entre centros: 260 con 3 columnas; con más columnas todo
+        # encoge para ocupar el mismo ancho (670 = 2 * 260 + 150)
+        self.paso = min(260.0, 670.0 * 260.0 / (260.0 * (self.cols - 1) + 150.0))
+        self.factor = self.paso / 260.0  # tamaño de vaso y bola relativo a la mesa de 3
+        S = self.S
+        f = self.factor
+        self.vaso_w, self.vaso_h = S(150 * f), S(150 * f)
+        self.bola_r = S(20 * f)
+        # Posición de la bola dentro del vaso que la contiene
+        self.bola_dx, self.bola_dy = S(55 * f), S(100 * f)
+        # Línea base de la bola en el menú (los vasos bajarán hasta alinear su base con esta altura)
+        # Más separación con el botón: bola 80 px (escalado) por encima del botón
+        self.ball_menu_y = alto - S(120) - S(80)
+        # En el menú cada bola va en el hueco bajo su vaso; con varias filas, las de arriba se
+        # separan lo bastante para que la fila de abajo no tape la bola (con un hueco menor
+        # para que la rejilla quepa bajo el HUD)
+        self.hueco_bola = S(40 * f) if self.filas == 1 else S(10 * f)
+        # Posiciones: arriba (pre-juego) y juego (centradas)
+        self.pos_top, base = self.posiciones_centradas()
+        # Posiciones de juego: misma X que base, y alineada a ball_menu_y (base de la última fila coincide con la bola)
+        fondo = base[-1][1]
+        self.pos_juego = [(x, self.ball_menu_y - self.vaso_h - (fondo - y)) for (x, y) in base]
+
+    def S(self, v: float) -> int:
+        return int(round(v * self.scale))
+
+    def posiciones_centradas(self):
+        # Rejilla de cols x filas; cada fila centrada (la última puede ir incompleta)
+        S = self.S
+        sep = S(self.paso)  # separación proporcional
+        cx = self.ancho // 2
+        fila_h = self.vaso_h + S(10 * self.factor)
+        fila_top = fila_h + self.hueco_bola + 2 * self.bola_r
+        # En el menú, la última fila con la bola justo por encima del botón
+        y_top = self.ball_menu_y - self.hueco_bola - self.vaso_h
+        # Centro ligeramente más bajo
+        y_center = self.alto // 2 - self.vaso_h // 2 + S(40)
+        top, mid = [], []
+        for f in range(self.filas):
+            primero = f * self.cols
+            m = min(self.cols, self.n_vasos - primero)
+            filas_debajo = self.filas - 1 - f
+            for j in range(m):
+                x = cx + int(round((j - (m - 1) / 2) * sep)) - self.vaso_w // 2
+                top.append((x, y_top - filas_debajo * fila_top))
+                mid.append((x, y_center - filas_debajo * fila_h))
+        return top, mid
+
+    def bola_menu_y(self, i: int) -> int:
+        # Altura de la bola en el menú: en el hueco bajo el vaso i (ball_menu_y en la última fila)
+        return self.pos_top[i][1] + self.vaso_h + self.hueco_bola
+
+
+class Vasos:
+    """Posiciones de los vasos como estructura de arrays (x e y en array('d'))."""
+
+    __slots__ = ("x", "y")
+
+    def __init__(self, posiciones):
+        self.x = array("d")
+        self.y = array("d")
+        self.colocar(posiciones)
+
+    def colocar(self, posiciones):
+        self.x[:] = array("d", [float(x) for x, _y in posiciones])
+        self.y[:] = array("d", [float(y) for _x, y in posiciones])
+
+    def __len__(self):
+        return len(self.x)
+
+    def __getitem__(self, i):
+        return self.x[i], self.y[i]
+
+
+def flujo_swaps(rng, n_vasos: int, no_repetir: bool = False, ciclos: float = 0.0):
+    """Generador infinito de movimientos sacados de rng: pares (i1, i2) o, con
+    probabilidad 'ciclos', ciclos de 3 vasos (a, b, c): a va al sitio de b, b al
+    de c y c al de a.
+
+    Cada movimiento cuesta O(1) y no se guarda nada aparte del último, así que
+    una sesión larga consume memoria constante. no_repetir evita que la misma
+    permutación salga dos veces seguidas: (a, b) y (b, a) son el mismo
+    intercambio, y (a, b, c), (b, c, a) y (c, a, b) el mismo ciclo, pero un
+    ciclo y su inverso (a, c, b) son movimientos distintos.
+    """
+    vasos = range(n_vasos)
+    anterior = None
+    while True:
+        k = 3 if ciclos and n_vasos >= 3 and rng.random() < ciclos else 2
+        mov = tuple(rng.sample(vasos, k))
+        if no_repetir:
+            # Rotación que empieza por el vaso menor: igual para toda la misma permutación
+            i = mov.index(min(mov))
+            clave = mov[i:] + mov[:i]
+            if clave == anterior:
+                continue
+            anterior = clave
+        yield mov
+
+
+_ARCO = TABLAS["arco"]
+
+
+class Juego:
+    """Estado completo de una partida. paso(dt) avanza la lógica dt milisegundos.
+
+    semilla=None usa el generador global de 'random'; con semilla cada partida
+    tiene su propio random.Random y es reproducible.
+    oyente(nombre) recibe los avisos de sonido: "mezcla", "acierto", "fallo".
+    grabador (ver grabacion.Grabador) registra acciones y mezclas; el dt de cada
+    frame lo graba PasoFijo.avanzar, antes de repartirlo en pasos fijos.
+
+    Durante la bajada y la mezcla paso() solo adelanta el reloj de la línea de
+    tiempo: las posiciones de 'vasos' (y lift_bola) se muestrean en sincronizar(),
+    que llaman PasoFijo, pos_bola y vaso_en antes de leerlas. Una simulación sin
+    ventana (simular) no paga por posiciones que nadie mira.
+    """
+
+    def __init__(self, mesa: Mesa, semilla=None, diff_index=1, oyente=None):
+        self.mesa = mesa
+        self.semilla = semilla
+        self.rng = random.Random(semilla) if semilla is not None else random
+        self.oyente = oyente
+        self.grabador = None
+
+        # Posiciones float de los vasos para animación (estructura de arrays)
+        self.vasos = Vasos(mesa.pos_top)
+        self.n_vasos = mesa.n_vasos
+
+        self.estado = ESTADO_MENU
+        self.mostrar_ms = 1500  # ms mostrando la bola al inicio (no usada si saltamos MOSTRAR)
+        self.timer_ms = self.mostrar_ms
+
+        # Índice del vaso que contiene la bola
+        self.indice_bola = self.rng.randint(0, self.n_vasos - 1)
+
+        # --- Parámetros de la mezcla animada ---
+        self.flujo = None          # generador de movimientos (ver flujo_swaps)
+        self.movs_mezcla = []      # movimientos ya sacados del flujo en la mezcla actual
+        self.mezcla_completa = True
+        self.mezcla_limite = 0.0   # ms disponibles para la mezcla actual
+        self.mezcla_ms = 0.0       # duración real (comprimida) de lo programado
+        self.mezcla_trabajo_ms = 0.0  # lo que duraría lo programado de uno en uno
+        self._pendiente = None     # movimiento sacado del flujo que aún no se ha programado
+        self._libres = None        # ms en que cada vaso termina su último movimiento
+        self._inicio_libre = 0.0   # lo antes que puede empezar un movimiento nuevo
+        self.swap_duracion = 380.0  # ms por intercambio (se ajusta con dificultad)
+        self.curva = 0  # px de desvío en arco de los pares (se ajusta con dificultad)
+        self.bajar_duracion = 600.0  # ms de la animación de bajada inicial
+
+        # --- Línea de tiempo de la animación en curso (bajada o mezcla) ---
+        self.linea = None
+        self._t_linea = 0.0       # instante de la línea tras el último paso (sin muestrear aún)
+        self.escala_tiempo = 1.0  # >1 acelera, <1 ralentiza (cámara lenta)
+        self.lift_bola = 0.0      # salto del vaso con bola (px, negativo = arriba)
+
+        self.mensaje = "Memoriza la posición de la bola"
+        self.score = 0
+        self.rounds = 0
+        self.diff_index = diff_index  # Media por defecto
+        self.seleccion = None
+        # --- Modo trampa (mostrar bola durante mezcla encima de los vasos) ---
+        self.modo_trampa = False
+        # --- Maratón: tras acertar, la mezcla sigue desde donde quedaron los vasos ---
+        self.maraton = False
+        self.racha = 0
+
+    def _emitir(self, nombre):
+        if self.oyente is not None:
+            self.oyente(nombre)
+
+    def _registrar(self, nombre, arg=0):
+        if self.grabador is not None:
+            self.grabador.accion(nombre, arg)
+
+    def _vasos_arriba(self):
+        self.vasos.colocar(self.mesa.pos_top)
+
+    # --- Acciones del jugador ---
+    def cambiar_dificultad(self, delta: int):
+        self._registrar("cambiar_dificultad", delta)
+        # Solo en MENÚ/FIN
+        if self.estado in (ESTADO_MENU, ESTADO_FIN):
+            diff_index = (self.diff_index + delta) % len(diff_names)
+            if diff_index != self.diff_index:
+                # El flujo de maratón se hizo con los 'ciclos' de la dificultad anterior
+                self.flujo = self._pendiente = None
+            self.diff_index = diff_index
+
+    def alternar_trampa(self):
+        self._registrar("alternar_trampa")
+        self.modo_trampa = not self.modo_trampa
+
+    def comenzar(self):
+        self._registrar("comenzar")
+        self._comenzar()
+
+    def _comenzar(self):
+        # Comenzar: animación de bajada (mantiene la bola que se mostró en el menú)
+        if self.estado != ESTADO_MENU:
+            return
+        self._vasos_arriba()
+        self.estado = ESTADO_BAJAR
+        self.seleccion = None
+        self.mensaje = ""
+        self.movs_mezcla = []
+        self._compilar_bajada()
+
+    def volver_menu(self):
+        self._registrar("volver_menu")
+        self._volver_menu("Elige dificultad y pulsa Comenzar")
+
+    def _volver_menu(self, mensaje):
+        # Desde FIN: volver al MENÚ (bola visible) y reiniciar posiciones arriba
+        if self.estado != ESTADO_FIN:
+            return
+        self._vasos_arriba()
+        self.indice_bola = self.rng.randint(0, self.n_vasos - 1)
+        self.estado = ESTADO_MENU
+        self.seleccion = None
+        self.mensaje = mensaje
+        self.movs_mezcla = []
+        self.flujo = self._pendiente = None
+        self.racha = 0
+        self.linea = None
+        self.lift_bola = 0.0
+
+    def alternar_maraton(self):
+        # Solo en MENÚ
+        self._registrar("alternar_maraton")
+        if self.estado == ESTADO_MENU:
+            self.maraton = not self.maraton
+
+    def pulsar_boton(self):
+        # Botón Comenzar (MENÚ) / Reintentar (FIN) / Seguir (FIN en maratón tras acertar)
+        self._registrar("pulsar_boton")
+        if self.estado == ESTADO_MENU:
+            self._comenzar()
+        elif self.estado == ESTADO_FIN and self.maraton and self.racha:
+            # Siguiente ronda sin volver al menú: los vasos se mezclan desde donde están
+            self.seleccion = None
+            self._preparar_mezcla()
+            self._emitir("mezcla")
+        elif self.estado == ESTADO_FIN:
+            # En FIN: volver a MENÚ en lugar de comenzar directo
+            self._volver_menu("Elige dificultad (←/→) y pulsa Comenzar")
+
+    def vaso_en(self, x, y):
+        # Índice del primer vaso bajo el punto (x, y), o None
+        self.sincronizar()
+        w, h = self.mesa.vaso_w, self.mesa.vaso_h
+        vy = self.vasos.y
+        for i, vx in enumerate(self.vasos.x):
+            vx = int(vx)
+            if vx <= x < vx + w:
+                y0 = int(vy[i])
+                if y0 <= y < y0 + h:
+                    return i
+        return None
+
+    def elegir(self, i):
+        if self.estado != ESTADO_ESPERA_CLIC or i is None:
+            return
+        self._registrar("elegir", i)
+        self.seleccion = i
+        if i == self.indice_bola:
+            self.mensaje = "Has acertado! Pulsa R para jugar de nuevo"
+            self.score += 1
+            self.racha += 1
+            if self.maraton:
+                self.mensaje = f"Racha de {self.racha}! Pulsa Seguir o R para volver al menú"
+            self._emitir("acierto")
+        else:
+            self.mensaje = "Has fallado. Pulsa R para jugar de nuevo"
+            self.racha = 0
+            self.flujo = self._pendiente = None
+            self._emitir("fallo")
+        self.estado = ESTADO_REVELA
+        self.rounds += 1
+
+    def animando(self) -> bool:
+        # True si la lógica depende del tiempo (hay que avanzar a ritmo de frame);
+        # en MENÚ, ESPERA_CLIC y FIN solo cambia algo cuando llega una acción
+        return self.estado in (ESTADO_BAJAR, ESTADO_MOSTRAR, ESTADO_MEZCLA, ESTADO_REVELA)
+
+    # --- Animaciones compiladas a línea de tiempo ---
+    def _compilar_bajada(self):
+        # Cada vaso baja de su posición superior a la de juego en bajar_duracion ms
+        linea = Linea([Pista(float(x), float(y)) for (x, y) in self.mesa.pos_top], self.escala_tiempo)
+        for i, (x, y) in enumerate(self.mesa.pos_juego):
+            linea.mover(i, 0.0, self.bajar_duracion, float(x), float(y))
+        self.linea = linea
+        self._t_linea = 0.0
+
+    def _programar_mezcla(self, hasta: float):
+        # Saca movimientos del flujo solo cuando hacen falta (mientras alguno pudiera empezar
+        # antes de 'hasta'). Cada uno empieza en cuanto sus vasos quedan libres, así que los
+        # que no comparten vasos van a la vez (como una red de ordenación) y el resultado es
+        # el mismo que haciéndolos de uno en uno.
+        linea = self.linea
+        pistas = linea.pistas
+        libres = self._libres
+        dur = self.swap_duracion
+        while not self.mezcla_completa:
+            mov = self._pendiente
+            if mov is None:
+                # Si ni siquiera un par cabe en el tiempo que queda, no se saca nada más
+                if self._inicio_libre + dur > self.mezcla_limite:
+                    self._cerrar_mezcla()
+                    break
+                if self._inicio_libre > hasta:
+                    break  # ningún movimiento nuevo podría empezar aún
+                mov = next(self.flujo)
+            # Se programa ya aunque empiece más tarde: su inicio solo depende de los anteriores
+            t0 = max(libres[i] for i in mov)
+            if t0 + dur > self.mezcla_limite:
+                self._pendiente = mov
+                self._cerrar_mezcla()
+                break
+            self._pendiente = None
+            curva = self.curva if len(mov) == 2 else max(self.curva, self.mesa.S(40 * self.mesa.factor))
+            destinos = [pistas[i].final() for i in mov[1:] + mov[:1]]
+            for i, (x, y) in zip(mov, destinos):
+                linea.mover(i, t0, t0 + dur, x, y, curva=curva)
+                libres[i] = t0 + dur
+            # Lo antes que puede empezar el siguiente: cuando quedan libres dos vasos
+            self._inicio_libre = heapq.nsmallest(2, libres)[1]
+            self.movs_mezcla.append(mov)
+            self.mezcla_ms = linea.duracion
+            self.mezcla_trabajo_ms += dur
+
+    def _cerrar_mezcla(self):
+        self.mezcla_completa = True
+        self._inicio_libre = math.inf  # ya no se programa nada más
+        if self.grabador is not None:
+            self.grabador.mezcla(self.diff_index, self.movs_mezcla)
+        if not self.maraton:
+            # Fuera de maratón el flujo no se reutiliza
+            self.flujo = self._pendiente = None
+
+    def _aplicar_linea(self, t):
+        # Lleva la línea al instante t de su reloj y devuelve si ha terminado. Solo se
+        # muestrea al terminar (quien sigue necesita las posiciones finales)
+        self._t_linea = t
+        if t < self.linea.duracion:
+            return False
+        self.sincronizar()
+        return True
+
+    def sincronizar(self):
+        # Muestrea la línea en el instante del último paso y copia a los vasos solo las
+        # posiciones que han cambiado; en la mezcla, también el salto del vaso con bola
+        linea = self.linea
+        if linea is None or linea.t == self._t_linea:
+            return
+        linea.buscar(self._t_linea)
+        pistas = linea.pistas
+        vx, vy = self.vasos.x, self.vasos.y
+        for i in linea.cambiadas:
+            pista = pistas[i]
+            vx[i] = pista.x
+            vy[i] = pista.y
+        if self.estado == ESTADO_MEZCLA:
+            p = pistas[self.indice_bola].p
+            self.lift_bola = -12.0 * self.mesa.scale * muestrear_tabla(_ARCO, p) if p >= 0.0 else 0.0
+
+    # --- Lógica por frame ---
+    def _preparar_mezcla(self):
+        self.estado = ESTADO_MEZCLA
+        self.mensaje = "Atento a la mezcla..."
+        cfg = difficulties[diff_names[self.diff_index]]
+        if cfg["dur_ms"] <= 0:
+            raise ValueError("dur_ms debe ser mayor que 0")
+        self.swap_duracion = cfg["dur_ms"]
+        self.curva = self.mesa.S(cfg["curva"] * self.mesa.factor)
+        self.mezcla_limite = cfg["swaps"] * cfg["dur_ms"]
+        self.mezcla_ms = self.mezcla_trabajo_ms = 0.0
+        self.mezcla_completa = False
+        self.movs_mezcla = []
+        self._libres = [0.0] * self.n_vasos
+        self._inicio_libre = 0.0
+        if self.flujo is None:
+            # En maratón el flujo sigue de una ronda a la siguiente (no repite movimiento seguido)
+            self.flujo = flujo_swaps(self.rng, self.n_vasos, no_repetir=self.maraton, ciclos=cfg["ciclos"])
+        vasos = self.vasos
+        self.linea = Linea([Pista(x, y) for x, y in zip(vasos.x, vasos.y)], self.escala_tiempo)
+        self._t_linea = 0.0
+        self._programar_mezcla(0.0)
+
+    def paso(self, dt):
+        estado = self.estado
+        if estado == ESTADO_MEZCLA:
+            # Primero el estado en el que se pasan casi todos los pasos
+            self._paso_mezcla(dt)
+        elif estado == ESTADO_MENU:
+            # Mensaje simple de menú (sin paréntesis); espera interacción
+            self.mensaje = "Elige dificultad y pulsa Comenzar"
+        elif estado == ESTADO_BAJAR:
+            # Interpolar posiciones desde top a juego
+            if self._aplicar_linea(self._t_linea + dt * self.linea.escala):
+                # Saltar fase de mostrar: comenzar mezcla directamente con el tiempo que sobró
+                sobrante = self.linea.sobrante()
+                self._preparar_mezcla()
+                self._emitir("mezcla")
+                if sobrante > 0.0:
+                    self._paso_mezcla(sobrante)
+        elif estado == ESTADO_MOSTRAR:
+            self.timer_ms -= dt
+            if self.timer_ms <= 0:
+                self._preparar_mezcla()
+                # Sonido de mezcla una sola vez, al empezarla (no en cada frame de MOSTRAR)
+                self._emitir("mezcla")
+        elif estado == ESTADO_REVELA:
+            # Se muestra la bola y se pasa a FIN (esperando R)
+            self.estado = ESTADO_FIN
+
+    def _paso_mezcla(self, dt):
+        # Un dt grande puede cubrir varios movimientos: se programan todos los que caen
+        # dentro y la línea se muestrea en el instante exacto, sin frames perdidos
+        t = self._t_linea + dt * self.linea.escala
+        if t >= self._inicio_libre:
+            self._programar_mezcla(t)
+        if self._aplicar_linea(t) and self.mezcla_completa:
+            # Terminar mezcla
+            self.linea = None
+            self.estado = ESTADO_ESPERA_CLIC
+            self.mensaje = "Haz clic en un vaso"
+
+    # --- Vista: posiciones derivadas para dibujar ---
+    def pos_bola(self):
+        # Posición de la bola ligada al vaso que la contiene
+        self.sincronizar()
+        mesa = self.mesa
+        x, y = self.vasos[self.indice_bola]
+        bx = int(x) + mesa.bola_dx
+        by = int(y) + mesa.bola_dy
+        return bx, by
+
+
+class PasoFijo:
+    """Reloj de lógica a paso fijo con acumulador e interpolación para dibujar.
+
+    avanzar(juego, dt) acumula el tiempo real del frame y llama a juego.paso()
+    con pasos de exactamente paso_ms, así que la simulación (y una grabación)
+    no depende de la frecuencia de render. Si se acumulan más de max_pasos
+    (un tirón: GC, cambio de pestaña, flip lento) el exceso se descarta en
+    lugar de intentar ponerse al día (espiral de la muerte); queda sumado en
+    'descartado_ms'. posiciones() interpola entre los dos últimos pasos.
+    Con juego.grabador se graba el dt real de cada frame (tirones incluidos);
+    al reproducir, grabacion.aplicar lo vuelve a pasar por avanzar().
+    """
+
+    def __init__(self, paso_ms: float = 1000.0 / 120.0, max_pasos: int = 12):
+        self.paso_ms = paso_ms
+        self.max_pasos = max_pasos
+        self.acumulado = 0.0
+        self.alfa = 0.0
+        self.descartado_ms = 0.0
+        self._juego = None  # juego del último paso (para saber si el previo es válido)
+        self._prev_x = array("d")
+        self._prev_y = array("d")
+        self._prev_lift = 0.0
+        self._x = array("d")
+        self._y = array("d")
+
+    def _guardar_previo(self, juego):
+        juego.sincronizar()
+        vasos = juego.vasos
+        self._prev_x[:] = vasos.x
+        self._prev_y[:] = vasos.y
+        self._prev_lift = juego.lift_bola
+
+    def avanzar(self, juego, dt: float):
+        if juego.grabador is not None:
+            # Cuantizado a microsegundos: al reproducir se usa exactamente el mismo valor
+            dt = juego.grabador.frame(dt)
+        if not juego.animando():
+            # En reposo la lógica no depende del tiempo: un paso de 0 ms y nada acumulado
+            self.acumulado = self.alfa = 0.0
+            self._juego = None
+            juego.paso(0.0)
+            return
+        if self._juego is not juego:
+            # Empieza (o vuelve) la animación: el estado previo es el actual
+            self._juego = juego
+            self._guardar_previo(juego)
+        paso = self.paso_ms
+        acumulado = self.acumulado + dt
+        limite = self.max_pasos * paso
+        if acumulado > limite:
+            self.descartado_ms += acumulado - limite
+            acumulado = limite
+        while acumulado >= paso and juego.animando():
+            self._guardar_previo(juego)
+            juego.paso(paso)
+            acumulado -= paso
+        if not juego.animando():
+            acumulado = 0.0
+        self.acumulado = acumulado
+        self.alfa = acumulado / paso
+
+    def posiciones(self, juego):
+        # (xs, ys) para dibujar: interpoladas con alfa entre el paso anterior y el actual
+        # (se dibuja con hasta un paso de retraso, a cambio de no extrapolar nunca)
+        juego.sincronizar()
+        vasos = juego.vasos
+        alfa = self.alfa
+        if self._juego is not juego or len(self._prev_x) != len(vasos):
+            return vasos.x, vasos.y
+        xs, ys = self._x, self._y
+        xs[:] = vasos.x
+        ys[:] = vasos.y
+        px, py = self._prev_x, self._prev_y
+        for i in range(len(xs)):
+            x0 = px[i]
+            if x0 != xs[i]:
+                xs[i] = x0 + (xs[i] - x0) * alfa
+            y0 = py[i]
+            if y0 != ys[i]:
+                ys[i] = y0 + (ys[i] - y0) * alfa
+        return xs, ys
+
+    def lift_bola(self, juego) -> float:
+        juego.sincronizar()
+        if self._juego is not juego:
+            return juego.lift_bola
+        return self._prev_lift + (juego.lift_bola - self._prev_lift) * self.alfa
+
+def simular(semilla, diff_index=1, dt=16.0, acertar=None, n_vasos=3):
+    """Juega una ronda completa sin ventana y devuelve el Juego al llegar a FIN.
+
+    acertar=None elige un vaso al azar; True/False fuerza acierto o fallo.
+    """
+    juego = Juego(Mesa(640, 480, n_vasos), semilla=semilla, diff_index=diff_index)
+    juego.comenzar()
+    while juego.estado != ESTADO_ESPERA_CLIC:
+        juego.paso(dt)
+    if acertar is None:
+        eleccion = juego.rng.randint(0, n_vasos - 1)
+    elif acertar:
+        eleccion = juego.indice_bola
+    else:
+        eleccion = (juego.indice_bola + 1) % n_vasos
+    juego.elegir(eleccion)
+    juego.paso(dt)
+    return juego
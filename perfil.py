@@ -0,0 +1,131 @@
+"""Perfilador por fases del bucle principal (eventos, lógica, dibujo y envío a pantalla).
+
+Guarda una ventana móvil de tiempos por estado del juego y calcula p50/p95/p99
+bajo demanda. Apagado no mide nada: los bucles solo consultan 'activo'.
+"""
+import csv
+import json
+import time
+from collections import deque
+
+FASES = ("eventos", "logica", "dibujar", "flip", "frame")
+PERCENTILES = (50, 95, 99)
+
+
+def _percentil(ordenados, p):
+    if not ordenados:
+        return 0.0
+    k = min(len(ordenados) - 1, max(0, int(round(p / 100.0 * (len(ordenados) - 1)))))
+    return ordenados[k]
+
+
+class Perfilador:
+    def __init__(self, ventana=600, refresco_ms=250):
+        self.activo = False
+        self.ventana = ventana          # nº de frames por estado que se conservan
+        self.refresco_ms = refresco_ms  # cada cuánto se recalculan las líneas del overlay
+        self._muestras = {}             # estado -> tupla de deques (una por fase), en ms
+        self._lineas = []
+        self._lineas_t = 0.0
+
+    def alternar(self):
+        self.activo = not self.activo
+        return self.activo
+
+    def registrar(self, estado, eventos, logica, dibujar, flip):
+        # Tiempos en segundos (perf_counter); se guardan en ms
+        colas = self._muestras.get(estado)
+        if colas is None:
+            colas = self._muestras[estado] = tuple(deque(maxlen=self.ventana) for _ in FASES)
+        total = eventos + logica + dibujar + flip
+        for cola, v in zip(colas, (eventos, logica, dibujar, flip, total)):
+            cola.append(v * 1000.0)
+
+    def resumen(self):
+        """{estado: {fase: {"n", "p50", "p95", "p99", "max"}}} en milisegundos."""
+        out = {}
+        for estado, colas in self._muestras.items():
+            fases = {}
+            for fase, cola in zip(FASES, colas):
+                ordenados = sorted(cola)
+                datos = {"n": len(ordenados)}
+                for p in PERCENTILES:
+                    datos[f"p{p}"] = round(_percentil(ordenados, p), 3)
+                datos["max"] = round(ordenados[-1], 3) if ordenados else 0.0
+                fases[fase] = datos
+            out[estado] = fases
+        return out
+
+    def lineas(self, estado):
+        # Texto del overlay para el estado actual (recalculado como mucho cada refresco_ms)
+        ahora = time.perf_counter()
+        if (ahora - self._lineas_t) * 1000.0 < self.refresco_ms and self._lineas and self._lineas[0].endswith(estado):
+            return self._lineas
+        self._lineas_t = ahora
+        colas = self._muestras.get(estado)
+        lineas = [f"perfil ms p50/p95/p99  {estado}"]
+        if colas is not None:
+            for fase, cola in zip(FASES, colas):
+                o = sorted(cola)
+                lineas.append(f"{fase:<8} {_percentil(o, 50):5.2f} {_percentil(o, 95):5.2f} {_percentil(o, 99):5.2f}")
+        self._lineas = lineas
+        return lineas
+
+    def exportar_json(self, ruta):
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(self.resumen(), f, indent=2, ensure_ascii=False)
+
+    def exportar_csv(self, ruta):
+        with open(ruta, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(["estado", "fase", "n"] + [f"p{p}" for p in PERCENTILES] + ["max"])
+            for estado, fases in self.resumen().items():
+                for fase, d in fases.items():
+                    w.writerow([estado, fase, d["n"]] + [d[f"p{p}"] for p in PERCENTILES] + [d["max"]])
+
+    def exportar(self, prefijo="perfil"):
+        # Exporta ambos formatos con marca de tiempo; devuelve las rutas
+        base = f"{prefijo}-{time.strftime('%Y%m%d-%H%M%S')}"
+        self.exportar_csv(base + ".csv")
+        self.exportar_json(base + ".json")
+        return base + ".csv", base + ".json"
+
+
+class Arranque:
+    """Desglose del arranque: tiempo de cada fase desde el inicio del proceso hasta el
+    primer frame, más lo que se difiere a después (p. ej. abrir el audio)."""
+
+    def __init__(self, t0=None):
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self._ultimo = self.t0
+        self.fases = []       # (fase, ms) en orden
+        self.diferidos = {}   # fase -> ms, medidas fuera del camino hasta el primer frame
+        self.terminado = False
+
+    def marcar(self, fase, ahora=None):
+        # Cierra la fase que acaba ahora (o en el instante 'ahora') desde la marca anterior
+        if self.terminado:
+            return
+        if ahora is None:
+            ahora = time.perf_counter()
+        self.fases.append((fase, (ahora - self._ultimo) * 1000.0))
+        self._ultimo = ahora
+
+    def terminar(self, fase="primer_frame"):
+        self.marcar(fase)
+        self.terminado = True
+
+    def total_ms(self):
+        return (self._ultimo - self.t0) * 1000.0
+
+    def resumen(self):
+        """{"fases": {fase: ms}, "total_ms": ms, "diferidos": {fase: ms}}."""
+        return {
+            "fases": {fase: round(ms, 2) for fase, ms in self.fases},
+            "total_ms": round(self.total_ms(), 2),
+            "diferidos": {fase: round(ms, 2) for fase, ms in self.diferidos.items()},
+        }
+
+    def texto(self):
+        partes = ", ".join(f"{fase} {ms:.1f}" for fase, ms in self.fases)
+        return f"arranque ms: {partes} = {self.total_ms():.1f}"
@@ -0,0 +1,74 @@
+"""Planificador de frames en el navegador (pygbag).
+
+En pygbag el bucle asyncio da una vuelta por cada requestAnimationFrame del navegador:
+'await asyncio.sleep(0)' ya espera al siguiente frame que se va a mostrar. Un
+pygame.time.Clock.tick(60) encima de eso duerme por su cuenta, se desacompasa con el
+refresco y dibuja frames que el navegador nunca enseña. Aquí cada vuelta es un paso de
+simulación y un render, con el dt medido entre frames del navegador; en reposo se cede
+más tiempo y con la pestaña oculta no se dibuja nada.
+"""
+import sys
+import time
+from collections import deque
+
+
+def _documento_navegador():
+    # pygbag expone el DOM en platform.window; fuera del navegador no hay documento
+    if sys.platform != "emscripten":
+        return None
+    try:
+        import platform
+
+        return platform.window.document
+    except (ImportError, AttributeError):
+        return None
+
+
+class PlanificadorWeb:
+    def __init__(self, espera_reposo_s=0.05, espera_oculta_s=0.25):
+        self.espera_reposo_s = espera_reposo_s
+        self.espera_oculta_s = espera_oculta_s
+        self.ventana_oculta = False   # por eventos de ventana (minimizada/oculta)
+        self.frames = 0               # vueltas con render
+        self.omitidos = 0             # vueltas sin render por pestaña oculta
+        self._documento = _documento_navegador()
+        self._ultimo = None
+        self._intervalos = deque(maxlen=60)  # ms entre frames del navegador (para fps())
+
+    def oculta(self) -> bool:
+        # document.hidden es lo fiable en el navegador (cambio de pestaña); si no se puede
+        # leer, los eventos de ventana que lleguen de SDL
+        if self._documento is not None:
+            try:
+                return bool(self._documento.hidden)
+            except Exception:
+                pass
+        return self.ventana_oculta
+
+    def empezar(self, animando: bool):
+        """dt (ms) para la lógica de esta vuelta y si hay que dibujarla."""
+        ahora = time.perf_counter()
+        dt = 0.0
+        if self._ultimo is not None:
+            intervalo = (ahora - self._ultimo) * 1000.0
+            self._intervalos.append(intervalo)
+            if animando:
+                dt = intervalo
+        self._ultimo = ahora
+        if self.oculta():
+            self.omitidos += 1
+            return dt, False
+        self.frames += 1
+        return dt, True
+
+    def espera(self, animando: bool) -> float:
+        # Segundos para 'await asyncio.sleep': 0 es el siguiente frame del navegador
+        if self.oculta():
+            return self.espera_oculta_s
+        return 0.0 if animando else self.espera_reposo_s
+
+    def fps(self) -> float:
+        if not self._intervalos:
+            return 0.0
+        media = sum(self._intervalos) / len(self._intervalos)
+        return 1000.0 / media if media > 0 else 0.0
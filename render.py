@@ -0,0 +1,458 @@
+import time
+import warnings
+from collections import OrderedDict
+
+import pygame
+
+# --- Renderizado por rectángulos sucios ---
+# dibujar() no pinta directamente: añade a la Escena una lista de órdenes de dibujo,
+# cada una con una clave que identifica lo que se ve (contenido + posición) y el
+# rectángulo que ocupa. Al presentar, se comparan las claves con las del frame
+# anterior y solo se repintan (con clip) y se envían a pantalla las zonas que cambian.
+# Las órdenes que son blits (add_blit) no se llaman una a una: las consecutivas se
+# agrupan en una sola llamada a Surface.blits() con una lista que se reutiliza.
+_BLIT = object()  # marca de orden de blit (se agrupa en Surface.blits)
+
+
+def _enviar(escena, fn, *args):
+    # Envío a pantalla (flip, update o present); con escena.medir guarda lo que tardó en t_envio
+    if not escena.medir:
+        fn(*args)
+        return
+    t0 = time.perf_counter()
+    fn(*args)
+    escena.t_envio = time.perf_counter() - t0
+
+
+class Escena:
+    def __init__(self, superficie: pygame.Surface, sucio=True, umbral=0.5):
+        self.superficie = superficie
+        self.sucio = sucio        # False: repintar todo y flip en cada frame
+        self.umbral = umbral      # fracción de pantalla sucia a partir de la cual se hace flip completo
+        self.ordenes = []
+        self._previas = None      # {clave: rect} del último frame presentado
+        # Estadísticas del último frame: "nada", "parcial" o "completo"
+        self.ultimo_modo = "completo"
+        self.ultimos_rects = []
+        # Con medir=True se guarda en t_envio lo que tardó flip/update (para el perfilador)
+        self.medir = False
+        self.t_envio = 0.0
+        self._lote = []           # (fuente, destino, área) pendientes de Surface.blits
+        self.llamadas_blits = 0   # llamadas a Surface.blits en el último frame
+
+    def add_blit(self, clave, rect, fuente, destino, area=None):
+        # Blit de 'fuente' (o de la región 'area' de un atlas) en 'destino'
+        self.ordenes.append((clave, rect, _BLIT, (fuente, destino, area), None))
+
+    def add(self, clave, rect, fn, *args, **kwargs):
+        # fn=None registra solo la clave/rect (elementos ya incluidos en una capa)
+        self.ordenes.append((clave, pygame.Rect(rect), fn, args, kwargs))
+
+    def add_rect(self, clave, rect, color):
+        # Rectángulo relleno de un color (fill respeta el clip del repintado parcial)
+        rect = pygame.Rect(rect)
+        self.ordenes.append((clave, rect, self.superficie.fill, (color, rect), {}))
+
+    def add_capa(self, nombre, capa):
+        # Una capa precompuesta se pinta con un único blit, pero cada componente aporta
+        # su propia clave para que un cambio solo ensucie su zona
+        sup = capa.superficie
+        self.add_blit((nombre,), sup.get_rect(), sup, (0, 0))
+        for clave, rect in capa.componentes:
+            self.add((nombre, clave), rect, None)
+
+    def invalidar(self):
+        # Forzar repintado completo en el próximo frame (p. ej. ventana descubierta)
+        self._previas = None
+
+    def cambiar_superficie(self, superficie: pygame.Surface):
+        # Tras redimensionar la ventana; puede ser una subsuperficie de la pantalla
+        self.superficie = superficie
+        self.invalidar()
+
+    def _rects_sucios(self, actuales: dict):
+        previas = self._previas
+        sucios = [r for k, r in actuales.items() if k not in previas]
+        sucios += [r for k, r in previas.items() if k not in actuales]
+        # Fusionar rectángulos solapados para repintar cada zona una sola vez
+        limite = self.superficie.get_rect()
+        fusion = []
+        for r in sucios:
+            r = r.clip(limite)
+            if r.w <= 0 or r.h <= 0:
+                continue
+            i = r.collidelist(fusion)
+            while i != -1:
+                r = r.union(fusion.pop(i))
+                i = r.collidelist(fusion)
+            fusion.append(r)
+        return fusion
+
+    def _pintar(self, ordenes):
+        # Ejecuta las órdenes en orden; cada tramo de blits seguidos es una sola llamada
+        lote = self._lote
+        blits = self.superficie.blits
+        for _clave, _rect, fn, args, kw in ordenes:
+            if fn is _BLIT:
+                lote.append(args)
+                continue
+            if fn is None:
+                continue
+            if lote:
+                blits(lote, doreturn=False)
+                self.llamadas_blits += 1
+                lote.clear()
+            fn(*args, **kw)
+        if lote:
+            blits(lote, doreturn=False)
+            self.llamadas_blits += 1
+            lote.clear()
+
+    def presentar(self):
+        ordenes = self.ordenes
+        self.ordenes = []
+        actuales = {}
+        for clave, rect, _fn, _args, _kw in ordenes:
+            actuales[clave] = rect
+        self.llamadas_blits = 0
+
+        rects = None
+        if self.sucio and self._previas is not None:
+            rects = self._rects_sucios(actuales)
+            area = sum(r.w * r.h for r in rects)
+            w, h = self.superficie.get_size()
+            if area > self.umbral * w * h:
+                rects = None
+        self._previas = actuales
+
+        if rects is None:
+            self._pintar(ordenes)
+            _enviar(self, pygame.display.flip)
+            self.ultimo_modo = "completo"
+            self.ultimos_rects = []
+            return
+        if not rects:
+            # Nada ha cambiado: ni se pinta ni se envía nada a pantalla
+            self.t_envio = 0.0
+            self.ultimo_modo = "nada"
+            self.ultimos_rects = []
+            return
+        sup = self.superficie
+        rects_ordenes = [o[1] for o in ordenes]
+        for zona in rects:
+            sup.set_clip(zona)
+            # collidelistall devuelve los índices en orden, así que se respeta el apilado
+            self._pintar([ordenes[i] for i in zona.collidelistall(rects_ordenes)])
+        sup.set_clip(None)
+        # Las zonas van en coordenadas de la superficie; la pantalla las quiere absolutas
+        dx, dy = sup.get_abs_offset()
+        if dx or dy:
+            rects = [r.move(dx, dy) for r in rects]
+        _enviar(self, pygame.display.update, rects)
+        self.ultimo_modo = "parcial"
+        self.ultimos_rects = rects
+
+
+# --- Backend GPU (pygame._sdl2.video) ---
+# Misma interfaz que Escena (add_blit, add_rect, add_capa, presentar...), así que dibujar()
+# no cambia. Cada superficie que llega en una orden (el atlas, la capa estática, los textos)
+# se sube una vez como Texture y cada frame es una serie de copias de regiones en el
+# Renderer que pygame.SCALED crea para la ventana; el escalado a la ventana lo hace SDL sin
+# pasar por la superficie de la pantalla ni por display.flip. El render por software sigue
+# siendo la opción por defecto y el respaldo si no hay Renderer.
+_RECT = object()  # marca de orden de rectángulo relleno
+
+
+def ventana_de_pantalla():
+    # pygame.Window de la ventana de pygame.display, o None si esta versión no tiene la API
+    try:
+        with warnings.catch_warnings():
+            # from_display_module está marcado como obsoleto para dibujar en la superficie
+            # de la ventana, que aquí no se usa
+            warnings.simplefilter("ignore", DeprecationWarning)
+            return pygame.Window.from_display_module()
+    except (AttributeError, pygame.error):
+        return None
+
+
+def renderer_de_pantalla():
+    # Renderer de la ventana de pygame.display; solo existe si se abrió con pygame.SCALED
+    try:
+        from pygame._sdl2.sdl2 import error as ErrorSDL
+        from pygame._sdl2.video import Renderer
+    except ImportError:
+        return None
+    ventana = ventana_de_pantalla()
+    if ventana is None:
+        return None
+    try:
+        return Renderer.from_window(ventana)
+    except (pygame.error, ErrorSDL):
+        return None
+
+
+class Texturas:
+    # Superficie -> Texture con expulsión LRU. Se guarda la superficie junto a su textura
+    # (así su id no se reutiliza mientras está en la caché); si la superficie se repinta en
+    # el sitio (capas estáticas), un cambio de 'version' la vuelve a subir.
+    def __init__(self, renderer, maximo=64):
+        from pygame._sdl2.video import Texture
+
+        self.renderer = renderer
+        self.maximo = maximo
+        self._crear = Texture.from_surface
+        self._items = OrderedDict()
+        self.subidas = 0
+
+    def obtener(self, surf: pygame.Surface, version=0):
+        clave = id(surf)
+        item = self._items.get(clave)
+        if item is not None and item[1] == version:
+            self._items.move_to_end(clave)
+            return item[2]
+        if item is not None:
+            tex = item[2]
+            tex.update(surf)
+        else:
+            tex = self._crear(self.renderer, surf)
+        self._items[clave] = (surf, version, tex)
+        self._items.move_to_end(clave)
+        self.subidas += 1
+        if len(self._items) > self.maximo:
+            self._items.popitem(last=False)
+        return tex
+
+    def __len__(self):
+        return len(self._items)
+
+
+class EscenaGPU:
+    def __init__(self, renderer, sucio=True, fondo=(0, 0, 0)):
+        self.renderer = renderer
+        self.texturas = Texturas(renderer)
+        self.sucio = sucio        # False: dibujar y presentar aunque nada haya cambiado
+        self.fondo = fondo
+        self.ordenes = []
+        self._previas = None
+        self._area = None         # rect del lienzo en la pantalla (viewport); None = toda
+        self.ultimo_modo = "completo"
+        self.ultimos_rects = []
+        self.medir = False
+        self.t_envio = 0.0
+        self.llamadas_blits = 0   # siempre 0: aquí no hay Surface.blits
+        self.copias = 0           # copias de textura en el último frame
+
+    def add_blit(self, clave, rect, fuente, destino, area=None):
+        self.ordenes.append((clave, rect, _BLIT, (fuente, destino, area, 0)))
+
+    def add(self, clave, rect, fn, *args, **kwargs):
+        # Solo registro de clave/rect: una función de dibujo por software no tiene
+        # equivalente en el Renderer (usar add_blit o add_rect)
+        if fn is not None:
+            raise TypeError("EscenaGPU solo admite órdenes add_blit/add_rect")
+        self.ordenes.append((clave, pygame.Rect(rect), None, None))
+
+    def add_rect(self, clave, rect, color):
+        rect = pygame.Rect(rect)
+        self.ordenes.append((clave, rect, _RECT, (color, rect)))
+
+    def add_capa(self, nombre, capa):
+        # La capa se repinta sobre la misma superficie: su número de reconstrucciones
+        # indica cuándo hay que volver a subir la textura
+        sup = capa.superficie
+        self.ordenes.append(((nombre,), sup.get_rect(), _BLIT, (sup, (0, 0), None, capa.reconstrucciones)))
+        for clave, rect in capa.componentes:
+            self.add((nombre, clave), rect, None)
+
+    def invalidar(self):
+        self._previas = None
+
+    def cambiar_superficie(self, superficie: pygame.Surface):
+        # Se dibuja en el mismo sitio de la pantalla que ocuparía la superficie
+        self._area = pygame.Rect(superficie.get_abs_offset(), superficie.get_size())
+        self.invalidar()
+
+    def presentar(self):
+        ordenes = self.ordenes
+        self.ordenes = []
+        actuales = {}
+        for clave, rect, _tipo, _args in ordenes:
+            actuales[clave] = rect
+        if self.sucio and actuales == self._previas:
+            # Nada ha cambiado: la ventana sigue mostrando el último frame presentado
+            self.t_envio = 0.0
+            self.ultimo_modo = "nada"
+            self.copias = 0
+            return
+        self._previas = actuales
+        # Tras present() el contenido del búfer trasero no está definido: siempre frame entero
+        r = self.renderer
+        r.set_viewport(None)
+        r.draw_color = self.fondo
+        r.clear()
+        r.set_viewport(self._area)
+        obtener = self.texturas.obtener
+        copias = 0
+        for _clave, _rect, tipo, args in ordenes:
+            if tipo is _BLIT:
+                fuente, destino, area, version = args
+                tex = obtener(fuente, version)
+                if area is None:
+                    tex.draw(None, pygame.Rect(destino[0], destino[1], tex.width, tex.height))
+                else:
+                    tex.draw(area, pygame.Rect(destino[0], destino[1], area[2], area[3]))
+                copias += 1
+            elif tipo is _RECT:
+                r.draw_color = args[0]
+                r.fill_rect(args[1])
+        self.copias = copias
+        _enviar(self, r.present)
+        self.ultimo_modo = "completo"
+        self.ultimos_rects = []
+
+
+# --- Capas precompuestas ---
+# Lo que casi nunca cambia (fondo, HUD, controles del menú) se pinta una vez en una
+# superficie y se reutiliza hasta que cambia su clave (puntuación, dificultad, estado...).
+# pintar(superficie) dibuja la capa y devuelve [(clave, rect), ...] de sus componentes.
+_SIN_CLAVE = object()
+
+
+class CapaEstatica:
+    def __init__(self, tam, pintar):
+        self.tam = tam
+        self.pintar = pintar
+        self.superficie = None
+        self.componentes = []
+        self.clave = _SIN_CLAVE
+        self.reconstrucciones = 0
+
+    def invalidar(self):
+        self.clave = _SIN_CLAVE
+
+    def redimensionar(self, tam):
+        if tuple(tam) != tuple(self.tam):
+            self.tam = tuple(tam)
+            self.superficie = None
+        self.invalidar()
+
+    def obtener(self, clave):
+        if self.superficie is None:
+            self.superficie = pygame.Surface(self.tam).convert()
+        if clave != self.clave:
+            self.componentes = self.pintar(self.superficie)
+            self.clave = clave
+            self.reconstrucciones += 1
+        return self
+
+
+# --- Atlas de sprites ---
+# Todos los sprites del juego (vasos, bola, flechas, marco del botón y sus variantes
+# prerenderizadas) en una sola superficie; cada uno se dibuja como un blit de su región.
+# Así un frame entero es una única lista para Surface.blits con la misma fuente.
+class Atlas:
+    def __init__(self, ancho_max=1024, margen=1):
+        self.ancho_max = ancho_max
+        self.margen = margen   # separación entre regiones
+        self.superficie = None
+        self.areas = {}
+        self.reconstrucciones = 0
+
+    def construir(self, sprites: dict):
+        # Empaquetado por estantes: de más alto a más bajo, llenando filas de izquierda a derecha
+        m = self.margen
+        orden = sorted(sprites.items(), key=lambda kv: kv[1].get_height(), reverse=True)
+        ancho = max([self.ancho_max] + [s.get_width() for _n, s in orden])
+        areas = {}
+        x = y = alto_fila = 0
+        for nombre, surf in orden:
+            w, h = surf.get_size()
+            if x and x + w > ancho:
+                x, y = 0, y + alto_fila + m
+                alto_fila = 0
+            areas[nombre] = pygame.Rect(x, y, w, h)
+            x += w + m
+            alto_fila = max(alto_fila, h)
+        usado_w = max((r.right for r in areas.values()), default=1)
+        usado_h = max((r.bottom for r in areas.values()), default=1)
+        sup = pygame.Surface((usado_w, usado_h), pygame.SRCALPHA).convert_alpha()
+        sup.fill((0, 0, 0, 0))
+        # BLEND_RGBA_MAX sobre el fondo a cero copia los píxeles tal cual, alfa incluido
+        # (un blit normal mezclaría los bordes semitransparentes con el negro del fondo)
+        sup.blits([(sprites[n], r, None, pygame.BLEND_RGBA_MAX) for n, r in areas.items()], doreturn=False)
+        self.superficie = sup
+        self.areas = areas
+        self.reconstrucciones += 1
+
+    def __contains__(self, nombre):
+        return nombre in self.areas
+
+
+# --- Caché de rasterizados por escala ---
+# Sprites y fuentes dependen del tamaño de la ventana: se guardan por (nombre, tamaño)
+# con expulsión LRU, así que volver a un tamaño reciente (p. ej. salir de pantalla
+# completa) no vuelve a decodificar ni a escalar nada.
+class CacheRaster:
+    def __init__(self, maximo=16):
+        self.maximo = maximo
+        self._items = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def get(self, clave):
+        valor = self._items.get(clave)
+        if valor is not None:
+            self._items.move_to_end(clave)
+            self.aciertos += 1
+        else:
+            self.fallos += 1
+        return valor
+
+    def put(self, clave, valor):
+        self._items[clave] = valor
+        self._items.move_to_end(clave)
+        if len(self._items) > self.maximo:
+            self._items.popitem(last=False)
+
+    def obtener(self, clave, crear, *args):
+        # get() y, si no está, crear(*args) y guardarlo
+        valor = self.get(clave)
+        if valor is None:
+            valor = crear(*args)
+            self.put(clave, valor)
+        return valor
+
+    def __len__(self):
+        return len(self._items)
+
+
+# --- Caché de textos renderizados ---
+# font.render rasteriza los glifos en cada llamada; los textos del juego cambian
+# pocas veces por ronda, así que se guardan las superficies por (fuente, texto,
+# color, antialias) con expulsión LRU para acotar la memoria.
+class CacheTextos:
+    def __init__(self, maximo=128):
+        self.maximo = maximo
+        self._surfs = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def render(self, font: pygame.font.Font, texto: str, color, antialias=True) -> pygame.Surface:
+        clave = (font, texto, tuple(color), antialias)
+        surf = self._surfs.get(clave)
+        if surf is not None:
+            self._surfs.move_to_end(clave)
+            self.aciertos += 1
+            return surf
+        self.fallos += 1
+        surf = font.render(texto, antialias, color)
+        self._surfs[clave] = surf
+        if len(self._surfs) > self.maximo:
+            self._surfs.popitem(last=False)
+        return surf
+
+    def limpiar(self):
+        self._surfs.clear()
+
+    def __len__(self):
+        return len(self._surfs)
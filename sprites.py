@@ -0,0 +1,226 @@
+import functools
+import hashlib
+import io
+import os
+import struct
+import zlib
+from pathlib import Path
+
+import pygame
+
+from motor import BASE_H, BASE_W
+
+# --- Utilidades de imagen ---
+# Transparencia por colorkey con tolerancia: un píxel pasa a alfa 0 si cada canal
+# RGB está a distancia <= tol del color de referencia (esquina superior izquierda
+# y colores de fallback). El canal alfa original no se tiene en cuenta al comparar.
+
+
+def _mascara_color(surf: pygame.Surface, ref, tol: int) -> pygame.Mask:
+    # from_threshold compara con '<' estricto, de ahí el +1 para mantener '<= tol'.
+    # Alfa de búsqueda 128 con umbral 255: cualquier alfa coincide (|a - 128| < 255)
+    t = min(tol + 1, 255)
+    r0, g0, b0 = ref[:3]
+    return pygame.mask.from_threshold(surf, (r0, g0, b0, 128), (t, t, t, 255))
+
+
+def apply_transparency(surf: pygame.Surface, fallback_colors=((255, 255, 255), (0, 0, 0)), tol=15):
+    surf = surf.convert_alpha()
+    try:
+        corner = surf.get_at((0, 0))[:3]
+    except Exception:
+        corner = None
+    # Unir en una sola máscara todos los colores a eliminar (trabajo en C, sin bucles por píxel)
+    refs = ([corner] if corner is not None else []) + list(fallback_colors)
+    if not refs:
+        return surf
+    mask = _mascara_color(surf, refs[0], tol)
+    for ref in refs[1:]:
+        mask.draw(_mascara_color(surf, ref, tol), (0, 0))
+    if mask.count() == 0:
+        return surf
+    # Multiplicar RGBA por (1, 1, 1, 0) en los píxeles marcados y por (1, 1, 1, 1) en el resto:
+    # con BLEND_RGBA_MULT el RGB queda intacto y solo se anula el alfa
+    alpha = mask.to_surface(setcolor=(255, 255, 255, 0), unsetcolor=(255, 255, 255, 255))
+    surf.blit(alpha, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+    return surf
+
+
+def apply_transparency_pixel(surf: pygame.Surface, fallback_colors=((255, 255, 255), (0, 0, 0)), tol=15):
+    # Implementación original píxel a píxel; se conserva como referencia para el benchmark
+    surf = surf.convert_alpha()
+    try:
+        corner = surf.get_at((0, 0))[:3]
+    except Exception:
+        corner = None
+    w, h = surf.get_size()
+    px = pygame.PixelArray(surf)
+    # Helper: marcar transparente si color está cerca de 'ref'
+    def clear_color_near(ref):
+        if ref is None:
+            return
+        r0, g0, b0 = ref
+        for y in range(h):
+            for x in range(w):
+                r, g, b, a = surf.unmap_rgb(px[x, y])
+                if abs(r - r0) <= tol and abs(g - g0) <= tol and abs(b - b0) <= tol:
+                    px[x, y] = (r, g, b, 0)
+    # Aplicar tolerancia a esquina y a fallback comunes
+    clear_color_near(corner)
+    for col in fallback_colors:
+        clear_color_near(col)
+    del px
+    return surf
+
+
+# --- Caché de sprites compilados ---
+# Cada sprite listo para blit (escalado y con transparencia aplicada) se guarda como
+# bytes RGBA/RGB crudos en assets/cache. El nombre del archivo incluye un hash del
+# contenido del original y de los parámetros, así que cambiar la imagen o el tamaño
+# invalida la entrada sin tener que borrar nada.
+VERSION_CACHE = 1
+CACHE_SUBDIR = "cache"
+
+# Sprites del juego: archivo original y si se les quita el fondo plano
+ASSETS = {
+    "fondo": {"archivo": "fondo.jpg", "alfa": False},
+    "vaso": {"archivo": "vaso.png", "alfa": True},
+    "bola": {"archivo": "bola.png", "alfa": True},
+}
+
+
+def tamanos_sprites(ancho: int, alto: int, factor: float = 1.0) -> dict:
+    # Tamaños de destino para una resolución dada: los mismos que motor.Mesa (vaso_w y
+    # 2 * bola_r), escalados desde el diseño base; factor < 1 encoge vaso y bola en mesas
+    # con muchos vasos (motor.Mesa.factor)
+    escala = min(ancho / BASE_W, alto / BASE_H)
+    v, b = int(round(150 * factor * escala)), 2 * int(round(20 * factor * escala))
+    return {"fondo": (ancho, alto), "vaso": (v, v), "bola": (b, b)}
+
+
+def clave_sprite(origen: Path, nombre: str, tam) -> str:
+    spec = ASSETS[nombre]
+    h = hashlib.sha1()
+    h.update(origen.read_bytes())
+    h.update(f"|v{VERSION_CACHE}|{tam[0]}x{tam[1]}|alfa={spec['alfa']}".encode())
+    return h.hexdigest()[:16]
+
+
+def ruta_cache(assets_dir: Path, nombre: str, tam, clave: str) -> Path:
+    fmt = "rgba" if ASSETS[nombre]["alfa"] else "rgb"
+    return assets_dir / CACHE_SUBDIR / f"{nombre}-{tam[0]}x{tam[1]}-{clave}.{fmt}"
+
+
+def preparar_sprite(origen: Path, nombre: str, tam) -> pygame.Surface:
+    # Ruta "en vivo": decodificar el original, escalar y quitar el fondo
+    if ASSETS[nombre]["alfa"]:
+        surf = pygame.image.load(str(origen)).convert_alpha()
+        surf = pygame.transform.scale(surf, tam).convert_alpha()
+        return apply_transparency(surf)
+    surf = pygame.image.load(str(origen)).convert()
+    return pygame.transform.scale(surf, tam)
+
+
+def guardar_sprite(destino: Path, nombre: str, surf: pygame.Surface):
+    fmt = "RGBA" if ASSETS[nombre]["alfa"] else "RGB"
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    tmp = destino.with_suffix(destino.suffix + ".tmp")
+    tmp.write_bytes(pygame.image.tobytes(surf, fmt))
+    os.replace(tmp, destino)
+
+
+def cargar_sprite(assets_dir: Path, nombre: str, tam, guardar=True):
+    """Carga un sprite desde la caché o, si no está, lo prepara en vivo.
+
+    Devuelve None si falta el original. Con guardar=True un fallo de caché deja
+    escrita la entrada para el siguiente arranque (si el directorio es escribible).
+    """
+    origen = assets_dir / ASSETS[nombre]["archivo"]
+    alfa = ASSETS[nombre]["alfa"]
+    try:
+        clave = clave_sprite(origen, nombre, tam)
+    except OSError:
+        return None
+    destino = ruta_cache(assets_dir, nombre, tam, clave)
+    try:
+        data = destino.read_bytes()
+        surf = pygame.image.frombytes(data, tuple(tam), "RGBA" if alfa else "RGB")
+        return surf.convert_alpha() if alfa else surf.convert()
+    except (OSError, ValueError):
+        pass
+    try:
+        surf = preparar_sprite(origen, nombre, tam)
+    except Exception:
+        return None
+    if guardar:
+        try:
+            guardar_sprite(destino, nombre, surf)
+        except OSError:
+            pass
+    return surf
+
+
+# --- Paquete web ---
+# En el navegador decodificar y quitar el fondo a los originales a tamaño completo es
+# demasiado lento, así que compilar_assets.py --web genera un único paquete con los
+# sprites ya escalados a la resolución del juego y con la transparencia aplicada:
+# el fondo como JPEG y los sprites con alfa como PNG, todo dentro de un bloque zlib.
+#   cabecera: b"TRPK" + versión u8 (sin comprimir)
+#   cuerpo zlib: n u8 y por entrada: nombre (u8 + bytes), formato (u8 + bytes),
+#                ancho u16, alto u16, largo u32 y los bytes de la imagen
+PAQUETE_WEB = "web/trilero.pak"
+MAGIA_PAQUETE = b"TRPK"
+VERSION_PAQUETE = 1
+
+
+def escribir_paquete(destino: Path, sprites: dict):
+    cuerpo = bytearray([len(sprites)])
+    for nombre, surf in sprites.items():
+        fmt = "png" if ASSETS[nombre]["alfa"] else "jpg"
+        buf = io.BytesIO()
+        pygame.image.save(surf, buf, f"{nombre}.{fmt}")
+        datos = buf.getvalue()
+        for txt in (nombre, fmt):
+            cuerpo += bytes([len(txt)]) + txt.encode()
+        cuerpo += struct.pack("<HHI", surf.get_width(), surf.get_height(), len(datos)) + datos
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    tmp = destino.with_suffix(destino.suffix + ".tmp")
+    tmp.write_bytes(MAGIA_PAQUETE + bytes([VERSION_PAQUETE]) + zlib.compress(bytes(cuerpo), 9))
+    os.replace(tmp, destino)
+
+
+@functools.lru_cache(maxsize=1)
+def leer_paquete(ruta: str) -> dict:
+    """{nombre: (formato, (ancho, alto), bytes)} del paquete; lanza ValueError si no es válido."""
+    with open(ruta, "rb") as f:
+        crudo = f.read()
+    if crudo[:4] != MAGIA_PAQUETE or crudo[4:5] != bytes([VERSION_PAQUETE]):
+        raise ValueError(f"{ruta}: no es un paquete de la versión {VERSION_PAQUETE}")
+    cuerpo = zlib.decompress(crudo[5:])
+    entradas = {}
+    pos = 1
+    for _ in range(cuerpo[0]):
+        textos = []
+        for _campo in range(2):
+            n = cuerpo[pos]
+            textos.append(cuerpo[pos + 1:pos + 1 + n].decode())
+            pos += 1 + n
+        w, h, largo = struct.unpack_from("<HHI", cuerpo, pos)
+        pos += 8
+        entradas[textos[0]] = (textos[1], (w, h), cuerpo[pos:pos + largo])
+        pos += largo
+    return entradas
+
+
+def sprite_de_paquete(ruta: Path, nombre: str, tam):
+    # Devuelve None si el paquete o la entrada no existen; solo reescala si el tamaño
+    # pedido no es el del paquete (p. ej. mesas con muchos vasos)
+    try:
+        fmt, tam_paquete, datos = leer_paquete(str(ruta))[nombre]
+    except (OSError, ValueError, KeyError):
+        return None
+    surf = pygame.image.load(io.BytesIO(datos), f"{nombre}.{fmt}")
+    surf = surf.convert_alpha() if ASSETS[nombre]["alfa"] else surf.convert()
+    if tuple(tam) != tam_paquete:
+        surf = pygame.transform.smoothscale(surf, tam)
+    return surf
@@ -0,0 +1,222 @@
+"""Línea de tiempo por keyframes para animar vasos (bajada y mezcla).
+
+Cada objeto tiene una Pista: una lista ordenada de movimientos (t0, t1, origen,
+destino, easing y curvatura). Entre movimientos el objeto se queda quieto. Muestrear una
+pista en un instante t cuesta O(1) amortizado gracias a un cursor que avanza con
+el tiempo (retroceder o saltar usa búsqueda binaria); mientras t siga dentro del
+movimiento activo ni siquiera se mueve el cursor. Las curvas de easing se
+precalculan en tablas, así que evaluar una no llama a funciones trigonométricas.
+"""
+import math
+from bisect import bisect_right
+
+RESOLUCION_TABLA = 1024
+
+
+def _tabla(fn):
+    # Una muestra de más (repite la última) para interpolar en p = 1 sin comprobarlo
+    tabla = [fn(k / RESOLUCION_TABLA) for k in range(RESOLUCION_TABLA + 1)]
+    tabla.append(tabla[-1])
+    return tabla
+
+
+# Curvas precalculadas sobre p en [0, 1]
+TABLAS = {
+    "lineal": _tabla(lambda p: p),
+    "coseno": _tabla(lambda p: 0.5 - 0.5 * math.cos(math.pi * p)),  # ease-in-out
+    "arco": _tabla(lambda p: math.sin(math.pi * p)),                # 0 -> 1 -> 0 (saltos)
+}
+
+
+_ARCO = TABLAS["arco"]
+
+
+def muestrear_tabla(tabla, p: float) -> float:
+    # Interpolación lineal entre las dos muestras más cercanas
+    if p <= 0.0:
+        return tabla[0]
+    if p >= 1.0:
+        return tabla[-1]
+    f = p * RESOLUCION_TABLA
+    k = int(f)
+    a = tabla[k]
+    return a + (tabla[k + 1] - a) * (f - k)
+
+
+def _avance(t: float, t0: float, k: float, tabla):
+    # (p, e, a) de un movimiento en t: progreso, easing y desvío en arco (máximo a mitad).
+    # muestrear_tabla en línea, sin comprobar los extremos (es el camino caliente de cada frame)
+    f = (t - t0) * k
+    j = int(f)
+    e = tabla[j]
+    e += (tabla[j + 1] - e) * (f - j)
+    g = e * RESOLUCION_TABLA
+    j = int(g)
+    a = _ARCO[j]
+    a += (_ARCO[j + 1] - a) * (g - j)
+    return f / RESOLUCION_TABLA, e, a
+
+
+class Pista:
+    """Movimientos de un objeto. muestrear(t) deja en x, y la posición y en p el
+    progreso del movimiento activo (0..1) o -1.0 si está quieto."""
+
+    __slots__ = ("x0", "y0", "movs", "t1s", "_k", "_mov", "x", "y", "p")
+
+    def __init__(self, x: float, y: float):
+        self.x0, self.y0 = x, y
+        self.movs = []  # (t0, t1, xa, ya, xb, yb, tabla, cx, cy, RESOLUCION_TABLA / (t1 - t0))
+        self.t1s = []   # t1 de cada movimiento, para búsqueda binaria
+        self._k = 0     # primer movimiento que aún no ha terminado en el último t muestreado
+        self._mov = None  # movimiento en curso en el último t muestreado (None si quieto)
+        self.x, self.y, self.p = x, y, -1.0
+
+    def final(self):
+        if self.movs:
+            m = self.movs[-1]
+            return m[4], m[5]
+        return self.x0, self.y0
+
+    def mover(self, t0: float, t1: float, x: float, y: float, easing="coseno", curva: float = 0.0):
+        # Desde donde acabe el último movimiento hasta (x, y), entre t0 y t1.
+        # curva != 0 desvía el camino en arco: 'curva' px en perpendicular a mitad de recorrido
+        xa, ya = self.final()
+        cx = cy = 0.0
+        if curva:
+            dx, dy = x - xa, y - ya
+            largo = math.hypot(dx, dy)
+            if largo:
+                cx, cy = -dy / largo * curva, dx / largo * curva
+        self.movs.append((t0, t1, xa, ya, x, y, TABLAS[easing], cx, cy, RESOLUCION_TABLA / (t1 - t0)))
+        self.t1s.append(t1)
+
+    def muestrear(self, t: float):
+        mov = self._mov
+        if mov is None or not mov[0] <= t < mov[1]:
+            # Fuera del movimiento en curso: mover el cursor
+            movs = self.movs
+            n = len(movs)
+            k = self._k
+            if k > 0 and self.t1s[k - 1] > t:
+                # Hacia atrás (buscar): búsqueda binaria
+                k = bisect_right(self.t1s, t)
+            while k < n and movs[k][1] <= t:
+                k += 1
+            self._k = k
+            self._mov = None
+            if k == n:
+                self.x, self.y = self.final()
+                self.p = -1.0
+                return
+            mov = movs[k]
+            if t < mov[0]:
+                self.x, self.y, self.p = mov[2], mov[3], -1.0
+                return
+            self._mov = mov
+        t0, _t1, xa, ya, xb, yb, tabla, cx, cy, k = mov
+        self.p, e, a = _avance(t, t0, k, tabla)
+        self.x = xa + (xb - xa) * e + cx * a
+        self.y = ya + (yb - ya) * e + cy * a
+
+
+class Linea:
+    """Conjunto de pistas con un reloj propio (avanzar, buscar y escala de tiempo).
+
+    Al avanzar solo se muestrean las pistas que se mueven (o acaban de empezar o
+    terminar un movimiento); tras cada muestreo 'cambiadas' tiene sus índices, así
+    que el coste por frame no crece con el número de objetos quietos. Hasta el próximo
+    inicio o final de movimiento el conjunto activo no cambia: se reutiliza tal cual y
+    las pistas que se mueven a la vez con la misma curva (los vasos de un intercambio)
+    comparten el cálculo del easing.
+    """
+
+    def __init__(self, pistas, escala=1.0):
+        self.pistas = pistas
+        self.escala = escala
+        self.t = 0.0
+        self.duracion = max((p.t1s[-1] for p in pistas if p.t1s), default=0.0)
+        # (t0, índice) de cada movimiento; se ordena solo cuando se añaden nuevos
+        self._inicios = sorted((m[0], i) for i, p in enumerate(pistas) for m in p.movs)
+        self._ordenado = True
+        self._siguiente = 0   # primer inicio aún no alcanzado
+        self._activas = set()
+        self._cambio = 0.0    # hasta este t las pistas activas (y 'cambiadas') no cambian
+        self._tramos = []     # (t0, k, tabla, [(pista, xa, ya, dx, dy, cx, cy), ...]) activos
+        self.cambiadas = []
+
+    def mover(self, i: int, t0: float, t1: float, x: float, y: float, easing="coseno", curva: float = 0.0):
+        # Añadir un movimiento a la pista i (mantiene 'duracion' al día)
+        self.pistas[i].mover(t0, t1, x, y, easing, curva)
+        if t1 > self.duracion:
+            self.duracion = t1
+        inicios = self._inicios
+        if inicios and t0 < inicios[-1][0]:
+            self._ordenado = False
+        inicios.append((t0, i))
+        if t0 < self._cambio:
+            self._cambio = t0
+        if t0 <= self.t:
+            self._activas.add(i)  # empieza en el pasado: muestrearla ya en el próximo avance
+
+    def terminada(self) -> bool:
+        return self.t >= self.duracion
+
+    def sobrante(self) -> float:
+        # Tiempo real (sin escala) avanzado más allá del final; se arrastra a lo siguiente
+        return max(0.0, self.t - self.duracion) / self.escala
+
+    def buscar(self, t: float):
+        pistas = self.pistas
+        if self.t <= t < self._cambio:
+            # Mismos movimientos que en el último muestreo: un easing por tramo
+            self.t = t
+            for t0, k, tabla, grupo in self._tramos:
+                p, e, a = _avance(t, t0, k, tabla)
+                for pista, xa, ya, dx, dy, cx, cy in grupo:
+                    pista.x = xa + dx * e + cx * a
+                    pista.y = ya + dy * e + cy * a
+                    pista.p = p
+            return
+        t = max(0.0, t)
+        inicios = self._inicios
+        if not self._ordenado:
+            inicios.sort()
+            self._ordenado = True
+            self._siguiente = bisect_right(inicios, (self.t, len(self.pistas)))
+        activas = self._activas
+        if t < self.t:
+            # Hacia atrás: se muestrea todo y se recalcula qué pistas se mueven
+            activas.update(range(len(self.pistas)))
+            self._siguiente = bisect_right(inicios, (t, len(self.pistas)))
+        else:
+            k = self._siguiente
+            n = len(inicios)
+            while k < n and inicios[k][0] <= t:
+                activas.add(inicios[k][1])
+                k += 1
+            self._siguiente = k
+        self.t = t
+        cambiadas = self.cambiadas = list(activas)
+        cambio = inicios[self._siguiente][0] if self._siguiente < len(inicios) else math.inf
+        for i in cambiadas:
+            pista = pistas[i]
+            pista.muestrear(t)
+            if pista.p < 0.0:
+                activas.discard(i)
+            elif pista._mov[1] < cambio:
+                cambio = pista._mov[1]
+        if len(activas) == len(cambiadas):
+            self._cambio = cambio
+            tramos = {}
+            for i in cambiadas:
+                pista = pistas[i]
+                t0, _t1, xa, ya, xb, yb, tabla, cx, cy, k = pista._mov
+                grupo = tramos.setdefault((t0, k, id(tabla)), (t0, k, tabla, []))[3]
+                grupo.append((pista, xa, ya, xb - xa, yb - ya, cx, cy))
+            self._tramos = list(tramos.values())
+        else:
+            # Alguna pista ha terminado en este muestreo: el siguiente recalcula 'cambiadas'
+            self._cambio = t
+
+    def avanzar(self, dt: float):
+        self.buscar(self.t + dt * self.escala)
@@ -13,6 +13,14 @@ if errorlevel 1 (
 REM 1) Ensure pygbag
 py -m pip install --upgrade pip
 py -m pip install pygbag
+py -m pip install -r requirements.txt
+
+REM 1.1) Web asset pack (assets/web/trilero.pak)
+py compilar_assets.py --web
+if errorlevel 1 (
+  echo Asset pack build failed.
+  goto :end
+)
 
 REM 2) Build web (clean previous)
 if exist build rmdir /s /q build